@@ -0,0 +1,87 @@
+"""
+Бенчмарк слоя соединений Database: вызовы в секунду при открытии/закрытии
+соединения на каждый запрос (старое поведение) и с постоянным соединением.
+
+Запуск: python benchmarks/bench_database.py [--rows 5000] [--calls 5000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database
+from database.models import Employee, Department
+
+
+def make_employee(i: int, department_id: int) -> Employee:
+    return Employee(
+        id=None, last_name=f'Фамилия{i:06d}', first_name=f'Имя{i % 97}',
+        middle_name=None, department_id=department_id, position=f'Должность {i % 40}',
+        work_phone=f'+7 495 {i:07d}', mobile_phone=None, email=f'user{i}@example.com',
+        birth_date='1985-%02d-%02d' % (i % 12 + 1, i % 28 + 1), hire_date='2015-01-01',
+        photo=None, room=str(i % 300), skills=None, manager_id=None,
+        work_schedule=None, telegram=None, whatsapp=None, skype=None
+    )
+
+
+def fill(database: Database, rows: int):
+    department_ids = [database.add_department(Department(id=None, name=f'Отдел {d}',
+                                                         parent_id=None, manager_id=None))
+                      for d in range(20)]
+    with database.transaction():
+        for i in range(rows):
+            database.add_employee(make_employee(i, department_ids[i % len(department_ids)]))
+    return department_ids
+
+
+def open_close_get_department(db_path: str, department_id: int):
+    """Поведение до пула: новое соединение на каждый вызов"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute('SELECT * FROM Departments WHERE id=?', (department_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def measure(label: str, func, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    elapsed = time.perf_counter() - started
+    rate = calls / elapsed
+    print(f'{label:<40} {rate:>12,.0f} вызовов/с')
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--calls', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        database = Database(db_path)
+        department_ids = fill(database, args.rows)
+
+        before = measure('get_department: open/close на вызов',
+                         lambda i: open_close_get_department(db_path, department_ids[i % 20]),
+                         args.calls)
+        after = measure('get_department: постоянное соединение',
+                        lambda i: database.get_department(department_ids[i % 20]),
+                        args.calls)
+        print(f'Ускорение: x{after / before:.1f}')
+
+        employee_ids = [row['id'] for row in database.connect().execute('SELECT id FROM Employees')]
+        measure('get_employee: постоянное соединение',
+                lambda i: database.get_employee(employee_ids[i % len(employee_ids)]),
+                args.calls)
+        database.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Бенчмарк импорта: add_employee с фиксацией на каждую строку (старый импорт)
+против bulk_insert_employees одной транзакцией.
+
+Запуск: python benchmarks/bench_import.py [--rows 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database
+from bench_database import make_employee
+
+
+def measure(label: str, func, rows: int) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed
+    print(f'{label:<40} {rate:>12,.0f} строк/с ({elapsed:.2f} с)')
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, 'per_row.db'))
+        before = measure('add_employee по одной строке',
+                         lambda: [database.add_employee(make_employee(i, None))
+                                  for i in range(args.rows)],
+                         args.rows)
+        database.close()
+
+        database = Database(os.path.join(tmp, 'bulk.db'))
+        after = measure('bulk_insert_employees',
+                        lambda: database.bulk_insert_employees(
+                            (make_employee(i, None) for i in range(args.rows)),
+                            batch_size=args.batch_size),
+                        args.rows)
+        database.close()
+
+        print(f'Ускорение: x{after / before:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Бенчмарк быстрого поиска: FTS5 против LIKE-перебора на синтетических данных.
+
+Запуск: python benchmarks/bench_search.py [--rows 100000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database
+
+LAST_NAMES = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев',
+              'Соколов', 'Михайлов', 'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев']
+FIRST_NAMES = ['Иван', 'Петр', 'Алексей', 'Сергей', 'Андрей', 'Дмитрий', 'Мария', 'Анна',
+               'Елена', 'Ольга', 'Наталья', 'Татьяна']
+POSITIONS = ['Инженер', 'Бухгалтер', 'Менеджер', 'Аналитик', 'Разработчик', 'Юрист',
+             'Дизайнер', 'Тестировщик', 'Администратор', 'Руководитель проекта']
+SKILLS = ['Python', 'SQL', 'Excel', '1С', 'Java', 'Переговоры', 'Linux', 'Qt', 'Docker']
+
+QUERIES = ['Иванов', 'серг', 'разраб', 'user12345', '495 123', 'Docker', 'Смирнов Анна']
+
+
+def fill(database: Database, rows: int):
+    rnd = random.Random(42)
+    data = []
+    for i in range(rows):
+        data.append((
+            f'{rnd.choice(LAST_NAMES)}{"а" if i % 2 else ""}', rnd.choice(FIRST_NAMES), None,
+            rnd.choice(POSITIONS), f'+7 495 {rnd.randint(100, 999)}-{rnd.randint(10, 99)}-{i % 100:02d}',
+            None, f'user{i}@example.com', ', '.join(rnd.sample(SKILLS, 3)), str(rnd.randint(100, 999))
+        ))
+    with database.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO Employees (last_name, first_name, middle_name, position, work_phone,
+                                   mobile_phone, email, skills, room)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', data)
+
+
+def measure(database: Database, query: str, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        found = database.search_employee_summaries(query)
+    return (time.perf_counter() - started) / repeat * 1000, len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, 'bench.db'))
+        if not database.fts_enabled:
+            print('SQLite собран без FTS5: сравнение невозможно')
+            return
+
+        print(f'Заполнение {args.rows} строк...')
+        fill(database, args.rows)
+
+        print(f'{"запрос":<16} {"LIKE, мс":>10} {"FTS5, мс":>10} {"найдено LIKE/FTS":>18}')
+        for query in QUERIES:
+            database.fts_enabled = False
+            like_ms, like_found = measure(database, query, args.repeat)
+            database.fts_enabled = True
+            fts_ms, fts_found = measure(database, query, args.repeat)
+            print(f'{query:<16} {like_ms:>10.2f} {fts_ms:>10.2f} {like_found:>9}/{fts_found:<8}')
+        database.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 from .database import Database
-from .models import Employee, Department, User
+from .models import (Employee, EmployeeSummary, Department, User, RowError, BulkInsertResult,
+                     EmployeeStatistics)
 from .cache import DataCache
 
-__all__ = ['Database', 'Employee', 'Department', 'User', 'DataCache']
+__all__ = ['Database', 'Employee', 'EmployeeSummary', 'Department', 'User', 'RowError',
+           'BulkInsertResult', 'EmployeeStatistics', 'DataCache']
 
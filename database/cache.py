@@ -1,26 +1,115 @@
-from typing import Dict, Optional, List
-from database.models import Employee, Department
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, Optional, List, Set, Tuple
+from database.models import EmployeeSummary, EmployeeStatistics, Department
 from datetime import datetime, timedelta
 
 class DataCache:
     def __init__(self, ttl_seconds: int = 300):
         self.ttl = timedelta(seconds=ttl_seconds)
-        self._employees_cache: Optional[List[Employee]] = None
+        self._employees_cache: Optional[List[EmployeeSummary]] = None
         self._employees_timestamp: Optional[datetime] = None
         self._departments_cache: Optional[List[Department]] = None
         self._departments_timestamp: Optional[datetime] = None
-        self._employee_by_id: Dict[int, Employee] = {}
+        self._employee_by_id: Dict[int, EmployeeSummary] = {}
         self._department_by_id: Dict[int, Department] = {}
+        self._statistics_cache: Optional[EmployeeStatistics] = None
+        self._statistics_timestamp: Optional[datetime] = None
+        self._clear_indexes()
     
-    def get_employees(self) -> Optional[List[Employee]]:
+    def _clear_indexes(self):
+        self._employee_order: Dict[int, int] = {}
+        self._ids_by_department: Dict[Optional[int], Set[int]] = {}
+        self._ids_by_position: Dict[str, Set[int]] = {}
+        self._hire_dates: List[Tuple[str, int]] = []
+        self._ids_by_birth_month: Dict[int, Set[int]] = {}
+        self._ids_with_photo: Set[int] = set()
+    
+    def _build_indexes(self, employees: List[EmployeeSummary]):
+        self._clear_indexes()
+        
+        for order, emp in enumerate(employees):
+            self._employee_order[emp.id] = order
+            self._index_employee(emp, sort_hire_dates=False)
+        
+        self._hire_dates.sort()
+    
+    def _index_employee(self, emp: EmployeeSummary, sort_hire_dates: bool = True):
+        self._ids_by_department.setdefault(emp.department_id, set()).add(emp.id)
+        
+        if emp.position:
+            self._ids_by_position.setdefault(emp.position, set()).add(emp.id)
+        
+        if emp.hire_date:
+            entry = (str(emp.hire_date), emp.id)
+            if sort_hire_dates:
+                insort(self._hire_dates, entry)
+            else:
+                self._hire_dates.append(entry)
+        
+        month = self._birth_month(emp)
+        if month:
+            self._ids_by_birth_month.setdefault(month, set()).add(emp.id)
+        
+        if emp.has_photo:
+            self._ids_with_photo.add(emp.id)
+    
+    def _unindex_employee(self, emp: EmployeeSummary):
+        self._discard(self._ids_by_department, emp.department_id, emp.id)
+        
+        if emp.position:
+            self._discard(self._ids_by_position, emp.position, emp.id)
+        
+        if emp.hire_date:
+            entry = (str(emp.hire_date), emp.id)
+            pos = bisect_left(self._hire_dates, entry)
+            if pos < len(self._hire_dates) and self._hire_dates[pos] == entry:
+                del self._hire_dates[pos]
+        
+        month = self._birth_month(emp)
+        if month:
+            self._discard(self._ids_by_birth_month, month, emp.id)
+        
+        self._ids_with_photo.discard(emp.id)
+    
+    @staticmethod
+    def _discard(index: dict, key, emp_id: int):
+        # Пустые корзины удаляются, чтобы get_positions не возвращал
+        # должности, которых больше ни у кого нет
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(emp_id)
+            if not ids:
+                del index[key]
+    
+    @staticmethod
+    def _sort_key(emp: EmployeeSummary) -> Tuple[str, str]:
+        # Тот же порядок, что ORDER BY last_name, first_name в запросе списка
+        return (emp.last_name or '', emp.first_name or '')
+    
+    @staticmethod
+    def _birth_year(emp: EmployeeSummary) -> Optional[int]:
+        try:
+            return int(str(emp.birth_date)[:4]) if emp.birth_date else None
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _birth_month(emp: EmployeeSummary) -> Optional[int]:
+        try:
+            return int(str(emp.birth_date)[5:7]) if emp.birth_date else None
+        except ValueError:
+            return None
+    
+    def get_employees(self) -> Optional[List[EmployeeSummary]]:
         if self._is_valid(self._employees_timestamp):
             return self._employees_cache
         return None
     
-    def set_employees(self, employees: List[Employee]):
+    def set_employees(self, employees: List[EmployeeSummary]):
         self._employees_cache = employees
         self._employees_timestamp = datetime.now()
         self._employee_by_id = {emp.id: emp for emp in employees if emp.id}
+        self._build_indexes(employees)
     
     def get_departments(self) -> Optional[List[Department]]:
         if self._is_valid(self._departments_timestamp):
@@ -32,16 +121,187 @@ class DataCache:
         self._departments_timestamp = datetime.now()
         self._department_by_id = {dept.id: dept for dept in departments if dept.id}
     
-    def get_employee_by_id(self, emp_id: int) -> Optional[Employee]:
+    def get_statistics(self) -> Optional[EmployeeStatistics]:
+        if self._is_valid(self._statistics_timestamp):
+            return self._statistics_cache
+        return None
+    
+    def set_statistics(self, statistics: EmployeeStatistics):
+        self._statistics_cache = statistics
+        self._statistics_timestamp = datetime.now()
+    
+    def _count_in_statistics(self, emp: EmployeeSummary, delta: int):
+        stats = self._statistics_cache
+        if stats is None:
+            return
+        
+        stats.total += delta
+        if emp.has_photo:
+            stats.with_photo += delta
+        self._add_count(stats.by_department, emp.department_id, delta)
+        self._add_count(stats.by_position, emp.position, delta)
+        year = self._birth_year(emp)
+        if year is not None:
+            self._add_count(stats.by_birth_year, year, delta)
+    
+    @staticmethod
+    def _add_count(counts: dict, key, delta: int):
+        count = counts.get(key, 0) + delta
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+    
+    def get_employee_by_id(self, emp_id: int) -> Optional[EmployeeSummary]:
         return self._employee_by_id.get(emp_id)
     
+    def get_positions(self) -> List[str]:
+        return sorted(self._ids_by_position)
+    
+    def query_employees(self, department_id: Optional[int] = None,
+                        position: Optional[str] = None,
+                        position_contains: Optional[str] = None,
+                        hire_date_from: Optional[str] = None,
+                        hire_date_to: Optional[str] = None,
+                        birth_month: Optional[int] = None,
+                        has_photo: Optional[bool] = None) -> Optional[List[EmployeeSummary]]:
+        """Выборка из памяти пересечением вторичных индексов.
+        Возвращает None, если сотрудники еще не загружены в кэш"""
+        if self._employees_cache is None:
+            return None
+        
+        candidates: List[Set[int]] = []
+        
+        if department_id is not None:
+            candidates.append(self._ids_by_department.get(department_id, set()))
+        
+        if position:
+            candidates.append(self._ids_by_position.get(position, set()))
+        
+        if position_contains:
+            # casefold, а не LIKE: регистр кириллицы SQLite не сворачивает
+            needle = position_contains.casefold()
+            matched = set()
+            for value, ids in self._ids_by_position.items():
+                if needle in value.casefold():
+                    matched |= ids
+            candidates.append(matched)
+        
+        if hire_date_from or hire_date_to:
+            start = bisect_left(self._hire_dates, (hire_date_from,)) if hire_date_from else 0
+            # (дата, inf) больше любого (дата, id): верхняя граница включительная
+            end = (bisect_right(self._hire_dates, (hire_date_to, float('inf')))
+                   if hire_date_to else len(self._hire_dates))
+            candidates.append({emp_id for _, emp_id in self._hire_dates[start:end]})
+        
+        if birth_month is not None:
+            candidates.append(self._ids_by_birth_month.get(birth_month, set()))
+        
+        if has_photo is not None:
+            if has_photo:
+                candidates.append(self._ids_with_photo)
+            else:
+                candidates.append(set(self._employee_by_id) - self._ids_with_photo)
+        
+        if not candidates:
+            return list(self._employees_cache)
+        
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            result &= ids
+            if not result:
+                break
+        
+        return [self._employee_by_id[emp_id]
+                for emp_id in sorted(result, key=self._employee_order.__getitem__)]
+    
+    def upsert_employee(self, emp: EmployeeSummary) -> bool:
+        """Добавляет или обновляет сотрудника в загруженном списке и индексах.
+        Возвращает False, если список не загружен (обновлять нечего)"""
+        if self._employees_cache is None:
+            # Без прежней версии записи сводку не скорректировать
+            self.invalidate_statistics()
+            return False
+        
+        self._remove_from_list(emp.id)
+        
+        employees = self._employees_cache
+        key = self._sort_key(emp)
+        low, high = 0, len(employees)
+        while low < high:
+            middle = (low + high) // 2
+            if key < self._sort_key(employees[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        employees.insert(low, emp)
+        
+        self._employee_by_id[emp.id] = emp
+        self._index_employee(emp)
+        self._count_in_statistics(emp, 1)
+        self._renumber(low)
+        return True
+    
+    def remove_employee(self, emp_id: int) -> bool:
+        """Удаляет сотрудника из загруженного списка и индексов"""
+        if self._employees_cache is None:
+            self.invalidate_statistics()
+            return False
+        
+        self._remove_from_list(emp_id)
+        return True
+    
+    def _remove_from_list(self, emp_id: int):
+        old = self._employee_by_id.pop(emp_id, None)
+        if old is None:
+            return
+        
+        self._unindex_employee(old)
+        self._count_in_statistics(old, -1)
+        position = self._employee_order.pop(emp_id)
+        del self._employees_cache[position]
+        self._renumber(position)
+    
+    def _renumber(self, start: int):
+        employees = self._employees_cache
+        for order in range(start, len(employees)):
+            self._employee_order[employees[order].id] = order
+    
     def get_department_by_id(self, dept_id: int) -> Optional[Department]:
         return self._department_by_id.get(dept_id)
     
+    def get_departments_by_ids(self, dept_ids: Iterable[int],
+                               loader: Optional[Callable[[List[int]], Dict[int, Department]]] = None
+                               ) -> Dict[int, Department]:
+        """Отделы по набору id; отсутствующие в кэше догружаются одним вызовом loader"""
+        found = {}
+        missing = []
+        for dept_id in set(dept_ids):
+            if dept_id is None:
+                continue
+            dept = self._department_by_id.get(dept_id)
+            if dept is not None:
+                found[dept_id] = dept
+            else:
+                missing.append(dept_id)
+        
+        if missing and loader is not None:
+            loaded = loader(missing)
+            self._department_by_id.update(loaded)
+            found.update(loaded)
+        return found
+    
     def invalidate_employees(self):
         self._employees_cache = None
         self._employees_timestamp = None
         self._employee_by_id = {}
+        self._clear_indexes()
+        self.invalidate_statistics()
+    
+    def invalidate_statistics(self):
+        self._statistics_cache = None
+        self._statistics_timestamp = None
     
     def invalidate_departments(self):
         self._departments_cache = None
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+class ConnectionManager:
+    """Долгоживущие соединения SQLite: одно на поток, настраивается один раз"""
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, object]] = None):
+        self.db_path = db_path
+        self.pragmas = DEFAULT_PRAGMAS.copy()
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._generation = 0
+
+    def get(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.generation != self._generation:
+            connection = self._open()
+            self._local.connection = connection
+            self._local.generation = self._generation
+            self._local.depth = 0
+            self._local.after_commit = []
+        return connection
+
+    def _open(self) -> sqlite3.Connection:
+        # Соединение используется только своим потоком; check_same_thread
+        # отключен лишь для того, чтобы close_all мог закрыть все соединения
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name}={value}')
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """Транзакция на соединении текущего потока; вложенные вызовы
+        присоединяются к внешней транзакции"""
+        connection = self.get()
+        if self._local.depth > 0:
+            self._local.depth += 1
+            try:
+                yield connection
+            finally:
+                self._local.depth -= 1
+            return
+
+        self._local.depth = 1
+        self._local.after_commit = []
+        # Модуль sqlite3 сам открывает транзакцию только перед DML: без
+        # явного BEGIN SAVEPOINT и DDL выполнялись бы в режиме autocommit,
+        # и RELEASE внешней точки сохранения фиксировал бы ее отдельно
+        try:
+            if not connection.in_transaction:
+                connection.execute('BEGIN')
+            yield connection
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            self._local.after_commit = []
+            raise
+        finally:
+            self._local.depth = 0
+
+        callbacks, self._local.after_commit = self._local.after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def in_transaction(self) -> bool:
+        return getattr(self._local, 'depth', 0) > 0
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Выполняет callback после фиксации внешней транзакции текущего
+        потока (при откате он отбрасывается); вне транзакции - сразу"""
+        if self.in_transaction():
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def close_current(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
+
+    def close_all(self):
+        """Закрывает соединения всех потоков (вызывать при завершении работы)"""
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+            self._generation += 1
+        for connection in connections:
+            connection.close()
+        self._local.connection = None
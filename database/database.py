@@ -1,362 +1,547 @@
+import calendar
+import io
+import re
 import sqlite3
-from typing import List, Optional, Tuple
-from datetime import date
-from .models import Employee, Department, User
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, timedelta
+from .models import (Employee, EmployeeSummary, Department, User, RowError, BulkInsertResult,
+                     EmployeeStatistics)
+from .connection import ConnectionManager
+from .migrations import apply_migrations, store_photo
+
+SUMMARY_COLUMNS = '''
+    id, last_name, first_name, middle_name, department_id, position,
+    work_phone, mobile_phone, email, birth_date, hire_date, room, skills,
+    manager_id, work_schedule, telegram, whatsapp, skype,
+    photo_id IS NOT NULL AS has_photo
+'''
+
+FTS_COLUMNS = ('last_name', 'first_name', 'middle_name', 'position', 'work_phone',
+               'mobile_phone', 'email', 'skills', 'room')
+
+EMPLOYEE_INSERT_SQL = '''
+    INSERT INTO Employees (last_name, first_name, middle_name, department_id,
+                          position, work_phone, mobile_phone, email,
+                          birth_date, hire_date, photo_id, room, skills,
+                          manager_id, work_schedule, telegram, whatsapp, skype)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# События изменения сотрудников для подписчиков (кэш, интерфейс):
+# upsert/delete относятся к одной записи, reload - к массовому изменению
+EVENT_UPSERT = 'upsert'
+EVENT_DELETE = 'delete'
+EVENT_RELOAD = 'reload'
+
+# Веса bm25 в порядке FTS_COLUMNS: совпадение в ФИО важнее, чем в навыках
+FTS_WEIGHTS = '10.0, 8.0, 4.0, 3.0, 2.0, 2.0, 2.0, 1.0, 1.0'
 
 class Database:
     def __init__(self, db_path: str = "data/employees.db"):
         self.db_path = db_path
-        self.connection = None
+        self.connections = ConnectionManager(db_path)
+        self.fts_enabled = False
+        self._change_listeners: List[Callable[[str, Optional[int]], None]] = []
         self.init_database()
     
-    def connect(self):
-        self.connection = sqlite3.connect(self.db_path)
-        self.connection.row_factory = sqlite3.Row
-        return self.connection
+    def connect(self) -> sqlite3.Connection:
+        """Соединение текущего потока (открывается один раз и переиспользуется)"""
+        return self.connections.get()
     
     def close(self):
-        if self.connection:
-            self.connection.close()
+        # Обновляет статистику планировщика для индексов, которые она затрагивала
+        try:
+            self.connect().execute('PRAGMA optimize')
+        except sqlite3.Error:
+            pass
+        self.connections.close_all()
+    
+    def transaction(self):
+        """Контекстный менеджер транзакции: commit при успехе, rollback при ошибке"""
+        return self.connections.transaction()
+    
+    def add_change_listener(self, listener: Callable[[str, Optional[int]], None]):
+        """Подписка на изменения сотрудников: listener(event, employee_id).
+        Вызывается в потоке, выполнившем изменение, после фиксации транзакции"""
+        self._change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: Callable[[str, Optional[int]], None]):
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+    
+    def _notify_change(self, event: str, employee_id: Optional[int] = None):
+        if not self._change_listeners:
+            return
+        
+        def dispatch():
+            for listener in list(self._change_listeners):
+                listener(event, employee_id)
+        
+        self.connections.after_commit(dispatch)
+    
+    @staticmethod
+    def _row_to_employee(row: sqlite3.Row, photo: Optional[bytes] = None) -> Employee:
+        # Фото хранится в EmployeePhotos и подгружается только по запросу
+        return Employee(
+            id=row['id'],
+            last_name=row['last_name'],
+            first_name=row['first_name'],
+            middle_name=row['middle_name'],
+            department_id=row['department_id'],
+            position=row['position'],
+            work_phone=row['work_phone'],
+            mobile_phone=row['mobile_phone'],
+            email=row['email'],
+            birth_date=row['birth_date'],
+            hire_date=row['hire_date'],
+            photo=photo,
+            room=row['room'],
+            skills=row['skills'],
+            manager_id=row['manager_id'],
+            work_schedule=row['work_schedule'],
+            telegram=row['telegram'],
+            whatsapp=row['whatsapp'],
+            skype=row['skype']
+        )
+    
+    @staticmethod
+    def _row_to_summary(row: sqlite3.Row) -> EmployeeSummary:
+        # Порядок SUMMARY_COLUMNS совпадает с полями EmployeeSummary, поэтому
+        # строка раскладывается позиционно (поиск может вернуть десятки тысяч строк)
+        values = tuple(row)
+        return EmployeeSummary(*values[:-1], has_photo=bool(values[-1]))
+    
+    @staticmethod
+    def _fts_match_expression(query: str) -> Optional[str]:
+        """Запрос FTS5: каждое слово ищется по префиксу, слова объединяются через AND"""
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+    
+    def _search_sql(self, columns: str, query: str) -> Tuple[str, list]:
+        match_expression = self._fts_match_expression(query) if self.fts_enabled else None
+        
+        if match_expression:
+            sql = f'''
+                SELECT {columns} FROM Employees
+                JOIN (SELECT rowid AS match_id, bm25(EmployeesFTS, {FTS_WEIGHTS}) AS match_rank
+                      FROM EmployeesFTS WHERE EmployeesFTS MATCH ?) AS matches
+                  ON matches.match_id = Employees.id
+                ORDER BY matches.match_rank, last_name, first_name
+            '''
+            return sql, [match_expression]
+        
+        search_pattern = f'%{query}%'
+        sql = f'''
+            SELECT {columns} FROM Employees
+            WHERE last_name LIKE ? OR first_name LIKE ? OR middle_name LIKE ?
+               OR position LIKE ? OR work_phone LIKE ? OR mobile_phone LIKE ?
+               OR email LIKE ?
+            ORDER BY last_name, first_name
+        '''
+        return sql, [search_pattern] * 7
+    
+    @staticmethod
+    def _filter_clause(department_id: Optional[int] = None, position: Optional[str] = None,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> Tuple[str, list]:
+        where = '1=1'
+        params = []
+        
+        if department_id is not None:
+            where += ' AND department_id=?'
+            params.append(department_id)
+        
+        if position:
+            where += ' AND position LIKE ?'
+            params.append(f'%{position}%')
+        
+        if start_date:
+            where += ' AND hire_date >= ?'
+            params.append(start_date)
+        
+        if end_date:
+            where += ' AND hire_date <= ?'
+            params.append(end_date)
+        
+        return where, params
+    
+    @staticmethod
+    def _row_to_department(row: sqlite3.Row) -> Department:
+        return Department(
+            id=row['id'],
+            name=row['name'],
+            parent_id=row['parent_id'],
+            manager_id=row['manager_id']
+        )
     
     def init_database(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Departments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                parent_id INTEGER REFERENCES Departments(id),
-                manager_id INTEGER REFERENCES Employees(id)
-            )
-        ''')
+        """Приводит схему к последней версии (см. migrations.py)"""
+        # Каждая миграция фиксируется отдельной транзакцией
+        needs_vacuum = apply_migrations(self.connect().cursor())
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Employees (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                last_name TEXT NOT NULL,
-                first_name TEXT NOT NULL,
-                middle_name TEXT,
-                department_id INTEGER REFERENCES Departments(id),
-                position TEXT,
-                work_phone TEXT,
-                mobile_phone TEXT,
-                email TEXT,
-                birth_date DATE,
-                hire_date DATE,
-                photo BLOB,
-                room TEXT,
-                skills TEXT,
-                manager_id INTEGER REFERENCES Employees(id),
-                work_schedule TEXT,
-                telegram TEXT,
-                whatsapp TEXT,
-                skype TEXT
-            )
-        ''')
+        with self.transaction() as conn:
+            # FTS5 зависит от сборки SQLite, поэтому проверяется при каждом запуске
+            self.fts_enabled = self._init_fulltext_search(conn.cursor())
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL,
-                employee_id INTEGER REFERENCES Employees(id)
-            )
+        if needs_vacuum:
+            self.connect().execute('VACUUM')
+    
+    def reload_after_restore(self):
+        """Файл базы заменен восстановлением из копии: схема копии
+        доводится до текущей версии, подписчики перечитывают данные"""
+        self.init_database()
+        self._notify_change(EVENT_RELOAD)
+    
+    def _init_fulltext_search(self, cursor: sqlite3.Cursor) -> bool:
+        """Индекс FTS5 по Employees, синхронизируемый триггерами.
+        Возвращает False, если SQLite собран без FTS5 (поиск работает через LIKE)"""
+        columns = ', '.join(FTS_COLUMNS)
+        new_columns = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+        old_columns = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+        
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='EmployeesFTS'"
+        ).fetchone()
+        
+        try:
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS EmployeesFTS USING fts5(
+                    {columns},
+                    content='Employees', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS Employees_fts_insert AFTER INSERT ON Employees BEGIN
+                INSERT INTO EmployeesFTS(rowid, {columns}) VALUES (new.id, {new_columns});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS Employees_fts_delete AFTER DELETE ON Employees BEGIN
+                INSERT INTO EmployeesFTS(EmployeesFTS, rowid, {columns})
+                VALUES ('delete', old.id, {old_columns});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS Employees_fts_update AFTER UPDATE OF {columns} ON Employees BEGIN
+                INSERT INTO EmployeesFTS(EmployeesFTS, rowid, {columns})
+                VALUES ('delete', old.id, {old_columns});
+                INSERT INTO EmployeesFTS(rowid, {columns}) VALUES (new.id, {new_columns});
+            END
         ''')
         
-        conn.commit()
-        self.close()
+        if not exists:
+            cursor.execute("INSERT INTO EmployeesFTS(EmployeesFTS) VALUES ('rebuild')")
+        return True
+    
+    def _employee_insert_params(self, conn: sqlite3.Connection, employee: Employee) -> tuple:
+        return (employee.last_name, employee.first_name, employee.middle_name,
+                employee.department_id, employee.position, employee.work_phone,
+                employee.mobile_phone, employee.email, employee.birth_date,
+                employee.hire_date, store_photo(conn, employee.photo),
+                employee.room, employee.skills,
+                employee.manager_id, employee.work_schedule, employee.telegram,
+                employee.whatsapp, employee.skype)
     
     def add_employee(self, employee: Employee) -> int:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO Employees (last_name, first_name, middle_name, department_id,
-                                  position, work_phone, mobile_phone, email,
-                                  birth_date, hire_date, photo, room, skills,
-                                  manager_id, work_schedule, telegram, whatsapp, skype)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (employee.last_name, employee.first_name, employee.middle_name,
-              employee.department_id, employee.position, employee.work_phone,
-              employee.mobile_phone, employee.email, employee.birth_date,
-              employee.hire_date, employee.photo, employee.room, employee.skills,
-              employee.manager_id, employee.work_schedule, employee.telegram,
-              employee.whatsapp, employee.skype))
-        
-        employee_id = cursor.lastrowid
-        conn.commit()
-        self.close()
+        with self.transaction() as conn:
+            cursor = conn.execute(EMPLOYEE_INSERT_SQL, self._employee_insert_params(conn, employee))
+            employee_id = cursor.lastrowid
+            self._notify_change(EVENT_UPSERT, employee_id)
         return employee_id
     
+    def bulk_insert_employees(self, employees: Iterable[Employee], batch_size: int = 500,
+                              progress_callback: Optional[Callable[[int], None]] = None
+                              ) -> BulkInsertResult:
+        """Потоковая вставка сотрудников одной транзакцией пачками через executemany.
+        
+        Пачка с ошибкой откатывается до точки сохранения и вставляется
+        построчно, чтобы собрать ошибки; RowError.row - порядковый номер
+        записи во входной последовательности (с 1). progress_callback
+        получает число обработанных записей после каждой пачки.
+        """
+        result = BulkInsertResult()
+        processed = 0
+        
+        with self.transaction() as conn:
+            batch: List[Tuple[int, tuple]] = []
+            for number, employee in enumerate(employees, start=1):
+                batch.append((number, self._employee_insert_params(conn, employee)))
+                if len(batch) >= batch_size:
+                    self._insert_batch(conn, batch, result)
+                    processed += len(batch)
+                    batch = []
+                    if progress_callback:
+                        progress_callback(processed)
+            
+            if batch:
+                self._insert_batch(conn, batch, result)
+                processed += len(batch)
+                if progress_callback:
+                    progress_callback(processed)
+            
+            if result.errors:
+                # Фото строк, которые не удалось вставить, ни на что не ссылаются
+                conn.execute('''
+                    DELETE FROM EmployeePhotos WHERE id NOT IN
+                        (SELECT photo_id FROM Employees WHERE photo_id IS NOT NULL)
+                ''')
+            
+            if result.inserted:
+                self._notify_change(EVENT_RELOAD)
+        
+        return result
+    
+    @staticmethod
+    def _insert_batch(conn: sqlite3.Connection, batch: List[Tuple[int, tuple]],
+                      result: BulkInsertResult):
+        conn.execute('SAVEPOINT bulk_batch')
+        try:
+            conn.executemany(EMPLOYEE_INSERT_SQL, [params for _, params in batch])
+        except sqlite3.Error:
+            conn.execute('ROLLBACK TO bulk_batch')
+        else:
+            conn.execute('RELEASE bulk_batch')
+            result.inserted += len(batch)
+            return
+        
+        # Отдельный INSERT атомарен, поэтому ошибочная строка ничего не оставляет
+        conn.execute('RELEASE bulk_batch')
+        for number, params in batch:
+            try:
+                conn.execute(EMPLOYEE_INSERT_SQL, params)
+                result.inserted += 1
+            except sqlite3.Error as e:
+                result.errors.append(RowError(number, str(e)))
+    
     def update_employee(self, employee: Employee):
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE Employees SET last_name=?, first_name=?, middle_name=?,
-                                department_id=?, position=?, work_phone=?,
-                                mobile_phone=?, email=?, birth_date=?,
-                                hire_date=?, photo=?, room=?, skills=?,
-                                manager_id=?, work_schedule=?, telegram=?, whatsapp=?, skype=?
-            WHERE id=?
-        ''', (employee.last_name, employee.first_name, employee.middle_name,
-              employee.department_id, employee.position, employee.work_phone,
-              employee.mobile_phone, employee.email, employee.birth_date,
-              employee.hire_date, employee.photo, employee.room, employee.skills,
-              employee.manager_id, employee.work_schedule, employee.telegram,
-              employee.whatsapp, employee.skype, employee.id))
-        
-        conn.commit()
-        self.close()
+        with self.transaction() as conn:
+            conn.execute('''
+                UPDATE Employees SET last_name=?, first_name=?, middle_name=?,
+                                    department_id=?, position=?, work_phone=?,
+                                    mobile_phone=?, email=?, birth_date=?,
+                                    hire_date=?, photo_id=?, room=?, skills=?,
+                                    manager_id=?, work_schedule=?, telegram=?, whatsapp=?, skype=?
+                WHERE id=?
+            ''', (employee.last_name, employee.first_name, employee.middle_name,
+                  employee.department_id, employee.position, employee.work_phone,
+                  employee.mobile_phone, employee.email, employee.birth_date,
+                  employee.hire_date, store_photo(conn, employee.photo),
+                  employee.room, employee.skills,
+                  employee.manager_id, employee.work_schedule, employee.telegram,
+                  employee.whatsapp, employee.skype, employee.id))
+            self._notify_change(EVENT_UPSERT, employee.id)
     
     def delete_employee(self, employee_id: int):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM Employees WHERE id=?', (employee_id,))
-        conn.commit()
-        self.close()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM Employees WHERE id=?', (employee_id,))
+            self._notify_change(EVENT_DELETE, employee_id)
     
     def get_employee(self, employee_id: int) -> Optional[Employee]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Employees WHERE id=?', (employee_id,))
-        row = cursor.fetchone()
-        self.close()
+        """Полная запись с фото; списочные методы фото не загружают"""
+        row = self.connect().execute(
+            'SELECT * FROM Employees WHERE id=?', (employee_id,)
+        ).fetchone()
         
         if row:
-            return Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            )
+            return self._row_to_employee(row, self._read_photo(row['photo_id']))
         return None
     
-    def get_all_employees(self) -> List[Employee]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Employees ORDER BY last_name, first_name')
-        rows = cursor.fetchall()
-        self.close()
+    def open_photo(self, photo_id: Optional[int]):
+        """Фото для потокового чтения (read/seek, контекстный менеджер):
+        sqlite3.Blob с инкрементальным вводом-выводом, если он доступен.
+        None, если фото нет"""
+        if photo_id is None:
+            return None
         
-        employees = []
-        for row in rows:
-            employees.append(Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            ))
-        return employees
+        conn = self.connect()
+        if hasattr(conn, 'blobopen'):
+            try:
+                return conn.blobopen('EmployeePhotos', 'data', photo_id, readonly=True)
+            except sqlite3.OperationalError:
+                return None
+        
+        # Python < 3.11: без Blob API фото читается целиком
+        row = conn.execute('SELECT data FROM EmployeePhotos WHERE id=?', (photo_id,)).fetchone()
+        return io.BytesIO(row[0]) if row else None
+    
+    def _read_photo(self, photo_id: Optional[int]) -> Optional[bytes]:
+        blob = self.open_photo(photo_id)
+        if blob is None:
+            return None
+        with blob:
+            return blob.read()
+    
+    def get_all_employees(self) -> List[Employee]:
+        rows = self.connect().execute(
+            'SELECT * FROM Employees ORDER BY last_name, first_name'
+        ).fetchall()
+        return [self._row_to_employee(row) for row in rows]
     
     def search_employees(self, query: str) -> List[Employee]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        search_pattern = f'%{query}%'
-        cursor.execute('''
-            SELECT * FROM Employees
-            WHERE last_name LIKE ? OR first_name LIKE ? OR middle_name LIKE ?
-               OR position LIKE ? OR work_phone LIKE ? OR mobile_phone LIKE ?
-               OR email LIKE ?
-            ORDER BY last_name, first_name
-        ''', (search_pattern, search_pattern, search_pattern, search_pattern,
-              search_pattern, search_pattern, search_pattern))
-        
-        rows = cursor.fetchall()
-        self.close()
-        
-        employees = []
-        for row in rows:
-            employees.append(Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            ))
-        return employees
+        sql, params = self._search_sql('Employees.*', query)
+        rows = self.connect().execute(sql, params).fetchall()
+        return [self._row_to_employee(row) for row in rows]
     
     def filter_employees(self, department_id: Optional[int] = None,
                         position: Optional[str] = None) -> List[Employee]:
+        where, params = self._filter_clause(department_id, position)
+        rows = self.connect().execute(
+            f'SELECT * FROM Employees WHERE {where} ORDER BY last_name, first_name', params
+        ).fetchall()
+        return [self._row_to_employee(row) for row in rows]
+    
+    def list_employee_summaries(self, department_id: Optional[int] = None,
+                                position: Optional[str] = None,
+                                start_date: Optional[str] = None,
+                                end_date: Optional[str] = None) -> List[EmployeeSummary]:
+        """Список сотрудников для таблиц и фильтров без загрузки фото"""
+        where, params = self._filter_clause(department_id, position, start_date, end_date)
+        rows = self.connect().execute(
+            f'SELECT {SUMMARY_COLUMNS} FROM Employees WHERE {where} ORDER BY last_name, first_name',
+            params
+        ).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+    
+    def count_employees(self) -> int:
+        return self.connect().execute('SELECT COUNT(*) FROM Employees').fetchone()[0]
+    
+    def get_statistics(self) -> EmployeeStatistics:
+        """Сводка по сотрудникам запросами GROUP BY: каждая группировка
+        читает только свой индекс, строки и фото не загружаются"""
         conn = self.connect()
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM Employees WHERE 1=1'
-        params = []
-        
-        if department_id is not None:
-            query += ' AND department_id=?'
-            params.append(department_id)
-        
-        if position:
-            query += ' AND position LIKE ?'
-            params.append(f'%{position}%')
-        
-        query += ' ORDER BY last_name, first_name'
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        self.close()
+        stats = EmployeeStatistics()
+        
+        stats.total, stats.with_photo = conn.execute(
+            'SELECT COUNT(*), COUNT(photo_id) FROM Employees'
+        ).fetchone()
+        
+        stats.by_department = dict(conn.execute(
+            'SELECT department_id, COUNT(*) FROM Employees GROUP BY department_id'
+        ).fetchall())
+        stats.by_position = dict(conn.execute(
+            'SELECT position, COUNT(*) FROM Employees GROUP BY position'
+        ).fetchall())
+        
+        rows = conn.execute(
+            'SELECT substr(birth_date, 1, 4), COUNT(*) FROM Employees '
+            'WHERE birth_date IS NOT NULL GROUP BY substr(birth_date, 1, 4)'
+        ).fetchall()
+        for year, count in rows:
+            try:
+                year = int(year)
+            except (TypeError, ValueError):
+                continue
+            stats.by_birth_year[year] = stats.by_birth_year.get(year, 0) + count
+        
+        return stats
+    
+    def iter_employee_summaries(self, batch_size: int = 1000,
+                                department_id: Optional[int] = None,
+                                position: Optional[str] = None) -> Iterator[EmployeeSummary]:
+        """Потоковое чтение сотрудников (без фото) порциями через fetchmany:
+        память не зависит от размера таблицы"""
+        where, params = self._filter_clause(department_id, position)
+        cursor = self.connect().execute(
+            f'SELECT {SUMMARY_COLUMNS} FROM Employees WHERE {where} ORDER BY last_name, first_name',
+            params
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_summary(row)
+        finally:
+            cursor.close()
+    
+    def search_employee_summaries(self, query: str) -> List[EmployeeSummary]:
+        sql, params = self._search_sql(SUMMARY_COLUMNS, query)
+        rows = self.connect().execute(sql, params).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+    
+    def get_employee_summary(self, employee_id: int) -> Optional[EmployeeSummary]:
+        row = self.connect().execute(
+            f'SELECT {SUMMARY_COLUMNS} FROM Employees WHERE id=?', (employee_id,)
+        ).fetchone()
         
-        employees = []
-        for row in rows:
-            employees.append(Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            ))
-        return employees
+        if row:
+            return self._row_to_summary(row)
+        return None
+    
+    def get_employee_photo(self, employee_id: int) -> Optional[bytes]:
+        row = self.connect().execute(
+            'SELECT photo_id FROM Employees WHERE id=?', (employee_id,)
+        ).fetchone()
+        return self._read_photo(row['photo_id']) if row else None
     
     def add_department(self, department: Department) -> int:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO Departments (name, parent_id, manager_id)
-            VALUES (?, ?, ?)
-        ''', (department.name, department.parent_id, department.manager_id))
-        
-        department_id = cursor.lastrowid
-        conn.commit()
-        self.close()
-        return department_id
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO Departments (name, parent_id, manager_id)
+                VALUES (?, ?, ?)
+            ''', (department.name, department.parent_id, department.manager_id))
+            return cursor.lastrowid
     
     def update_department(self, department: Department):
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE Departments SET name=?, parent_id=?, manager_id=?
-            WHERE id=?
-        ''', (department.name, department.parent_id, department.manager_id,
-              department.id))
-        
-        conn.commit()
-        self.close()
+        with self.transaction() as conn:
+            conn.execute('''
+                UPDATE Departments SET name=?, parent_id=?, manager_id=?
+                WHERE id=?
+            ''', (department.name, department.parent_id, department.manager_id,
+                  department.id))
     
     def delete_department(self, department_id: int):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM Departments WHERE id=?', (department_id,))
-        conn.commit()
-        self.close()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM Departments WHERE id=?', (department_id,))
     
     def get_department(self, department_id: int) -> Optional[Department]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Departments WHERE id=?', (department_id,))
-        row = cursor.fetchone()
-        self.close()
+        row = self.connect().execute(
+            'SELECT * FROM Departments WHERE id=?', (department_id,)
+        ).fetchone()
         
         if row:
-            return Department(
-                id=row['id'],
-                name=row['name'],
-                parent_id=row['parent_id'],
-                manager_id=row['manager_id']
-            )
+            return self._row_to_department(row)
         return None
     
     def get_all_departments(self) -> List[Department]:
+        rows = self.connect().execute('SELECT * FROM Departments ORDER BY name').fetchall()
+        return [self._row_to_department(row) for row in rows]
+    
+    def get_departments_by_ids(self, department_ids: Iterable[int]) -> Dict[int, Department]:
+        """Пакетная загрузка отделов: один запрос на каждые 500 id вместо запроса на строку"""
+        ids = sorted({dept_id for dept_id in department_ids if dept_id is not None})
+        departments = {}
         conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Departments ORDER BY name')
-        rows = cursor.fetchall()
-        self.close()
         
-        departments = []
-        for row in rows:
-            departments.append(Department(
-                id=row['id'],
-                name=row['name'],
-                parent_id=row['parent_id'],
-                manager_id=row['manager_id']
-            ))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT * FROM Departments WHERE id IN ({placeholders})', chunk
+            ).fetchall()
+            for row in rows:
+                departments[row['id']] = self._row_to_department(row)
         return departments
     
     def add_user(self, user: User) -> int:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO Users (username, password_hash, role, employee_id)
-            VALUES (?, ?, ?, ?)
-        ''', (user.username, user.password_hash, user.role, user.employee_id))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        self.close()
-        return user_id
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO Users (username, password_hash, role, employee_id)
+                VALUES (?, ?, ?, ?)
+            ''', (user.username, user.password_hash, user.role, user.employee_id))
+            return cursor.lastrowid
     
     def get_user(self, username: str) -> Optional[User]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Users WHERE username=?', (username,))
-        row = cursor.fetchone()
-        self.close()
+        row = self.connect().execute(
+            'SELECT * FROM Users WHERE username=?', (username,)
+        ).fetchone()
         
         if row:
             return User(
@@ -370,86 +555,77 @@ class Database:
     
     def filter_employees_by_hire_date(self, start_date: Optional[str] = None, 
                                       end_date: Optional[str] = None) -> List[Employee]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM Employees WHERE 1=1'
-        params = []
-        
-        if start_date:
-            query += ' AND hire_date >= ?'
-            params.append(start_date)
-        
-        if end_date:
-            query += ' AND hire_date <= ?'
-            params.append(end_date)
-        
-        query += ' ORDER BY hire_date DESC'
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        self.close()
-        
-        employees = []
-        for row in rows:
-            employees.append(Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            ))
-        return employees
+        where, params = self._filter_clause(start_date=start_date, end_date=end_date)
+        rows = self.connect().execute(
+            f'SELECT * FROM Employees WHERE {where} ORDER BY hire_date DESC', params
+        ).fetchall()
+        return [self._row_to_employee(row) for row in rows]
     
     def get_employees_by_birthday_month(self, month: int) -> List[Employee]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        # Индекс (birth_month, birth_day) покрывает и условие, и сортировку
+        rows = self.connect().execute('''
             SELECT * FROM Employees
-            WHERE CAST(strftime('%m', birth_date) AS INTEGER) = ?
-            ORDER BY strftime('%d', birth_date)
-        ''', (month,))
-        
-        rows = cursor.fetchall()
-        self.close()
-        
-        employees = []
+            WHERE birth_month = ?
+            ORDER BY birth_day
+        ''', (month,)).fetchall()
+        return [self._row_to_employee(row) for row in rows]
+    
+    def get_upcoming_birthdays(self, days: int = 7,
+                               today: Optional[date] = None) -> List[Tuple[EmployeeSummary, date]]:
+        """Дни рождения с сегодняшнего дня по today + days включительно:
+        пары (сотрудник, дата ближайшего дня рождения) по возрастанию даты.
+        
+        Окно, переходящее через новый год, делится на два диапазона
+        (месяц, день), каждый из которых выбирается по индексу. Родившиеся
+        29 февраля в невисокосный год попадают на 28 февраля.
+        """
+        today = today or date.today()
+        
+        if days >= 365:
+            ranges = [((1, 1), (12, 31), today.year)]
+        else:
+            end = today + timedelta(days=max(days, 0))
+            start_md = (today.month, today.day)
+            end_md = (end.month, end.day)
+            if end.year == today.year:
+                ranges = [(start_md, end_md, today.year)]
+            else:
+                ranges = [(start_md, (12, 31), today.year), ((1, 1), end_md, end.year)]
+        
+        selects = []
+        params = []
+        for start_md, end_md, year in ranges:
+            if end_md == (2, 28) and not calendar.isleap(year):
+                end_md = (2, 29)
+            selects.append(f'''
+                SELECT {SUMMARY_COLUMNS} FROM Employees
+                WHERE (birth_month, birth_day) BETWEEN (?, ?) AND (?, ?)
+            ''')
+            params.extend([*start_md, *end_md])
+        
+        rows = self.connect().execute(' UNION ALL '.join(selects), params).fetchall()
+        
+        upcoming = []
         for row in rows:
-            employees.append(Employee(
-                id=row['id'],
-                last_name=row['last_name'],
-                first_name=row['first_name'],
-                middle_name=row['middle_name'],
-                department_id=row['department_id'],
-                position=row['position'],
-                work_phone=row['work_phone'],
-                mobile_phone=row['mobile_phone'],
-                email=row['email'],
-                birth_date=row['birth_date'],
-                hire_date=row['hire_date'],
-                photo=row['photo'],
-                room=row['room'],
-                skills=row['skills'],
-                manager_id=row.get('manager_id'),
-                work_schedule=row.get('work_schedule'),
-                telegram=row.get('telegram'),
-                whatsapp=row.get('whatsapp'),
-                skype=row.get('skype')
-            ))
-        return employees
-
+            summary = self._row_to_summary(row)
+            birthday = self._next_birthday(summary.birth_date, today)
+            if birthday is not None:
+                upcoming.append((summary, birthday))
+        
+        upcoming.sort(key=lambda item: (item[1], item[0].last_name, item[0].first_name))
+        return upcoming
+    
+    @staticmethod
+    def _next_birthday(birth_date, today: date) -> Optional[date]:
+        try:
+            month, day = int(str(birth_date)[5:7]), int(str(birth_date)[8:10])
+        except ValueError:
+            return None
+        
+        year = today.year if (month, day) >= (today.month, today.day) else today.year + 1
+        if (month, day) == (2, 29) and not calendar.isleap(year):
+            return date(year, 2, 28)
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
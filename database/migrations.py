@@ -0,0 +1,207 @@
+"""
+Версионные миграции схемы. Номер примененной миграции хранится в
+PRAGMA user_version; при открытии базы выполняются только новые шаги.
+
+Новую миграцию добавляют в конец MIGRATIONS со следующим номером;
+уже выпущенные шаги не меняют.
+"""
+import hashlib
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+def store_photo(conn: sqlite3.Connection, photo: Optional[bytes]) -> Optional[int]:
+    """id фото в EmployeePhotos; одинаковые фото хранятся один раз"""
+    if not photo:
+        return None
+
+    digest = hashlib.sha256(photo).hexdigest()
+    row = conn.execute('SELECT id FROM EmployeePhotos WHERE sha256=?', (digest,)).fetchone()
+    if row:
+        return row[0]
+    return conn.execute(
+        'INSERT INTO EmployeePhotos (sha256, size, data) VALUES (?, ?, ?)',
+        (digest, len(photo), photo)
+    ).lastrowid
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> set:
+    return {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+
+def _base_schema(cursor: sqlite3.Cursor) -> bool:
+    # IF NOT EXISTS: базы, созданные до появления миграций, уже содержат таблицы
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Departments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            parent_id INTEGER REFERENCES Departments(id),
+            manager_id INTEGER REFERENCES Employees(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            last_name TEXT NOT NULL,
+            first_name TEXT NOT NULL,
+            middle_name TEXT,
+            department_id INTEGER REFERENCES Departments(id),
+            position TEXT,
+            work_phone TEXT,
+            mobile_phone TEXT,
+            email TEXT,
+            birth_date DATE,
+            hire_date DATE,
+            photo BLOB,
+            room TEXT,
+            skills TEXT,
+            manager_id INTEGER REFERENCES Employees(id),
+            work_schedule TEXT,
+            telegram TEXT,
+            whatsapp TEXT,
+            skype TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            employee_id INTEGER REFERENCES Employees(id)
+        )
+    ''')
+    return False
+
+def _photo_store(cursor: sqlite3.Cursor) -> bool:
+    """Отдельное хранилище фото с дедупликацией по sha256; фото из старого
+    столбца Employees.photo переносятся в него"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS EmployeePhotos (
+            id INTEGER PRIMARY KEY,
+            sha256 TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    ''')
+
+    if 'photo_id' not in _table_columns(cursor, 'Employees'):
+        cursor.execute('ALTER TABLE Employees ADD COLUMN photo_id INTEGER REFERENCES EmployeePhotos(id)')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_photo_id ON Employees(photo_id)')
+
+    # Фото, на которое больше никто не ссылается, удаляется вместе с последней ссылкой
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS Employees_photo_delete
+        AFTER DELETE ON Employees WHEN old.photo_id IS NOT NULL BEGIN
+            DELETE FROM EmployeePhotos WHERE id = old.photo_id
+                AND NOT EXISTS (SELECT 1 FROM Employees WHERE photo_id = old.photo_id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS Employees_photo_update
+        AFTER UPDATE OF photo_id ON Employees
+        WHEN old.photo_id IS NOT NULL AND old.photo_id IS NOT new.photo_id BEGIN
+            DELETE FROM EmployeePhotos WHERE id = old.photo_id
+                AND NOT EXISTS (SELECT 1 FROM Employees WHERE photo_id = old.photo_id);
+        END
+    ''')
+
+    # Переносим по одной записи, чтобы не держать все фото в памяти
+    employee_ids = [row[0] for row in cursor.execute(
+        'SELECT id FROM Employees WHERE photo IS NOT NULL'
+    ).fetchall()]
+    for employee_id in employee_ids:
+        photo = cursor.execute('SELECT photo FROM Employees WHERE id=?', (employee_id,)).fetchone()[0]
+        cursor.execute('UPDATE Employees SET photo_id=?, photo=NULL WHERE id=?',
+                       (store_photo(cursor.connection, photo), employee_id))
+
+    # Страницы, которые занимали фото внутри строк, освобождает VACUUM
+    return bool(employee_ids)
+
+def _hot_path_indexes(cursor: sqlite3.Cursor) -> bool:
+    # Составные индексы по фильтру и ФИО отдают строки сразу в порядке
+    # ORDER BY last_name, first_name без временной сортировки
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_name ON Employees(last_name, first_name)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_employees_department
+        ON Employees(department_id, last_name, first_name)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_employees_position
+        ON Employees(position, last_name, first_name)
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_manager ON Employees(manager_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_hire_date ON Employees(hire_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_birth_date ON Employees(birth_date)')
+    # Выражение совпадает с условием get_employees_by_birthday_month
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_employees_birth_month
+        ON Employees(CAST(strftime('%m', birth_date) AS INTEGER))
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_employee ON Users(employee_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_departments_parent ON Departments(parent_id)')
+    return False
+
+def _birthday_columns(cursor: sqlite3.Cursor) -> bool:
+    """Вычисляемые столбцы месяца и дня рождения с составным индексом:
+    выборка по месяцу и диапазону дат идет по индексу, без разбора дат
+    в каждой строке. VIRTUAL-столбцы не занимают места в строках таблицы"""
+    columns = {row[1] for row in cursor.execute('PRAGMA table_xinfo(Employees)')}
+    if 'birth_month' not in columns:
+        cursor.execute('''
+            ALTER TABLE Employees ADD COLUMN birth_month INTEGER
+            GENERATED ALWAYS AS (CAST(strftime('%m', birth_date) AS INTEGER)) VIRTUAL
+        ''')
+    if 'birth_day' not in columns:
+        cursor.execute('''
+            ALTER TABLE Employees ADD COLUMN birth_day INTEGER
+            GENERATED ALWAYS AS (CAST(strftime('%d', birth_date) AS INTEGER)) VIRTUAL
+        ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_birthday ON Employees(birth_month, birth_day)')
+    # Индекс по выражению из версии 3 заменен индексом по столбцам
+    cursor.execute('DROP INDEX IF EXISTS idx_employees_birth_month')
+    return False
+
+# (версия, описание, шаг); шаг возвращает True, если после миграции нужен VACUUM
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], bool]]] = [
+    (1, 'Базовые таблицы', _base_schema),
+    (2, 'Хранилище фото EmployeePhotos', _photo_store),
+    (3, 'Индексы для фильтров, сортировки и дней рождения', _hot_path_indexes),
+    (4, 'Столбцы birth_month/birth_day для дней рождения', _birthday_columns),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def schema_version(cursor: sqlite3.Cursor) -> int:
+    return cursor.execute('PRAGMA user_version').fetchone()[0]
+
+def apply_migrations(cursor: sqlite3.Cursor) -> bool:
+    """Применяет недостающие миграции; каждый шаг вместе с записью
+    user_version выполняется в своей транзакции и при ошибке откатывается
+    целиком. Вызывать вне транзакции. Возвращает True, если после
+    миграций стоит выполнить VACUUM"""
+    connection = cursor.connection
+    if connection.in_transaction:
+        raise RuntimeError('apply_migrations нельзя вызывать внутри транзакции')
+
+    needs_vacuum = False
+    for version, _, migrate in MIGRATIONS:
+        # BEGIN IMMEDIATE сразу берет блокировку записи: версия
+        # перечитывается под ней, и два процесса не применят шаг дважды
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            current = schema_version(cursor)
+            if current > LATEST_VERSION:
+                raise RuntimeError(
+                    f'Версия схемы базы ({current}) новее поддерживаемой ({LATEST_VERSION})'
+                )
+            if version <= current:
+                connection.rollback()
+                continue
+            needs_vacuum = migrate(cursor) or needs_vacuum
+            cursor.execute(f'PRAGMA user_version = {version}')
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+    return needs_vacuum
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Optional
+from typing import Dict, List, Optional
 
 @dataclass
 class Department:
@@ -39,3 +39,66 @@ class User:
     role: str
     employee_id: Optional[int]
 
+
+@dataclass
+class EmployeeSummary:
+    """Строка списка сотрудников без фото; само фото загружается по запросу"""
+    id: int
+    last_name: str
+    first_name: str
+    middle_name: Optional[str]
+    department_id: Optional[int]
+    position: Optional[str]
+    work_phone: Optional[str]
+    mobile_phone: Optional[str]
+    email: Optional[str]
+    birth_date: Optional[date]
+    hire_date: Optional[date]
+    room: Optional[str]
+    skills: Optional[str]
+    manager_id: Optional[int]
+    work_schedule: Optional[str]
+    telegram: Optional[str]
+    whatsapp: Optional[str]
+    skype: Optional[str]
+    has_photo: bool
+
+@dataclass
+class RowError:
+    row: int
+    message: str
+
+@dataclass
+class BulkInsertResult:
+    inserted: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+@dataclass
+class EmployeeStatistics:
+    """Агрегаты по сотрудникам; возраст считается по году рождения,
+    поэтому сводка не устаревает в течение года"""
+    total: int = 0
+    with_photo: int = 0
+    by_department: Dict[Optional[int], int] = field(default_factory=dict)
+    by_position: Dict[Optional[str], int] = field(default_factory=dict)
+    by_birth_year: Dict[int, int] = field(default_factory=dict)
+    
+    @property
+    def photo_ratio(self) -> float:
+        return self.with_photo / self.total if self.total else 0.0
+    
+    def age_histogram(self, year: int, min_age: int = 0, max_age: int = 150) -> Dict[int, int]:
+        """Число сотрудников по возрасту (год минус год рождения)"""
+        ages: Dict[int, int] = {}
+        for birth_year, count in self.by_birth_year.items():
+            age = year - birth_year
+            if min_age <= age <= max_age:
+                ages[age] = ages.get(age, 0) + count
+        return ages
+    
+    def average_age(self, year: int, min_age: int = 0, max_age: int = 150) -> Optional[float]:
+        ages = self.age_histogram(year, min_age, max_age)
+        count = sum(ages.values())
+        if not count:
+            return None
+        return sum(age * n for age, n in ages.items()) / count
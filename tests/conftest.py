@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database
+from database.models import Employee
+
+
+def make_employee(i: int, last_name: str = None) -> Employee:
+    return Employee(
+        id=None, last_name=last_name or f'Фамилия{i:06d}', first_name=f'Имя{i}',
+        middle_name=None, department_id=None, position=f'Должность {i % 5}',
+        work_phone=None, mobile_phone=None, email=f'user{i}@example.com',
+        birth_date='1985-01-01', hire_date='2015-01-01', photo=None, room=None,
+        skills=None, manager_id=None, work_schedule=None, telegram=None,
+        whatsapp=None, skype=None
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(str(tmp_path / 'employees.db'))
+    yield db
+    db.close()
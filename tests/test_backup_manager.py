@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from utils.backup_manager import BackupManager
+from utils.jobs import JobCancelled
+from tests.conftest import make_employee
+
+
+@pytest.fixture
+def backup_manager(database, tmp_path):
+    return BackupManager(database.db_path, backup_dir=str(tmp_path / 'backups'))
+
+
+def test_restore_returns_backed_up_rows(database, backup_manager):
+    for i in range(3):
+        database.add_employee(make_employee(i))
+    progress = []
+
+    backup_path = backup_manager.create_backup(
+        'перед чисткой', progress_callback=lambda done, total: progress.append((done, total))
+    )
+
+    assert progress and progress[-1][0] == progress[-1][1]
+    assert [(b['path'], b['comment']) for b in backup_manager.get_backups()] == [
+        (backup_path, 'перед чисткой')
+    ]
+    BackupManager.check_integrity(backup_path)
+
+    for employee in database.get_all_employees():
+        database.delete_employee(employee.id)
+    assert database.count_employees() == 0
+
+    assert backup_manager.restore_backup(backup_path)
+    database.reload_after_restore()
+    assert database.count_employees() == 3
+
+
+def test_cancelled_backup_leaves_no_files(database, backup_manager):
+    def cancel(done, total):
+        raise JobCancelled()
+
+    with pytest.raises(JobCancelled):
+        backup_manager.create_backup(progress_callback=cancel)
+
+    assert os.listdir(backup_manager.backup_dir) == []
+
+
+def test_corrupted_backup_is_not_restored(database, backup_manager, tmp_path):
+    database.add_employee(make_employee(1))
+    broken = tmp_path / 'backups' / 'employees_backup_broken.db'
+    broken.write_bytes(b'SQLite format 3\x00' + b'\xff' * 4096)
+
+    with pytest.raises(Exception):
+        BackupManager.check_integrity(str(broken))
+    with pytest.raises(Exception):
+        backup_manager.restore_backup(str(broken))
+    assert database.count_employees() == 1
@@ -0,0 +1,33 @@
+from dataclasses import replace
+from datetime import date
+
+from tests.conftest import make_employee
+
+
+def add_born(database, i, birth_date):
+    return database.add_employee(replace(make_employee(i), birth_date=birth_date))
+
+
+def upcoming(database, days, today):
+    return [(summary.id, birthday) for summary, birthday
+            in database.get_upcoming_birthdays(days, today=today)]
+
+
+def test_window_wraps_into_next_year(database):
+    december = add_born(database, 1, '1980-12-30')
+    january = add_born(database, 2, '1990-01-03')
+    add_born(database, 3, '1985-01-10')
+    add_born(database, 4, '1985-12-20')
+
+    assert upcoming(database, 7, date(2025, 12, 28)) == [
+        (december, date(2025, 12, 30)),
+        (january, date(2026, 1, 3)),
+    ]
+
+
+def test_feb_29_falls_on_feb_28_in_common_year(database):
+    leapling = add_born(database, 1, '1992-02-29')
+
+    assert upcoming(database, 0, date(2025, 2, 28)) == [(leapling, date(2025, 2, 28))]
+    assert upcoming(database, 3, date(2024, 2, 27)) == [(leapling, date(2024, 2, 29))]
+    assert upcoming(database, 0, date(2024, 2, 28)) == []
@@ -0,0 +1,45 @@
+import pytest
+
+from utils.jobs import CancellationToken, JobCancelled, JobContext
+from tests.conftest import make_employee
+
+
+def failing_rows(count: int, fail_after: int):
+    for i in range(count):
+        if i == fail_after:
+            raise RuntimeError('ошибка чтения файла')
+        yield make_employee(i)
+
+
+def test_bulk_insert_is_one_transaction(database):
+    with pytest.raises(RuntimeError):
+        database.bulk_insert_employees(failing_rows(20, fail_after=10), batch_size=3)
+
+    assert database.count_employees() == 0
+
+
+def test_cancelled_import_leaves_no_rows(database):
+    token = CancellationToken()
+    context = JobContext(token)
+
+    def progress(done):
+        if done >= 6:
+            token.cancel()
+        context.progress(done)
+
+    with pytest.raises(JobCancelled):
+        database.bulk_insert_employees((make_employee(i) for i in range(20)),
+                                       batch_size=3, progress_callback=progress)
+
+    assert database.count_employees() == 0
+
+
+def test_bad_rows_are_reported_and_skipped(database):
+    employees = [make_employee(i) for i in range(7)]
+    employees[4].last_name = None
+
+    result = database.bulk_insert_employees(employees, batch_size=3)
+
+    assert result.inserted == 6
+    assert [error.row for error in result.errors] == [5]
+    assert database.count_employees() == 6
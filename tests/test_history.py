@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from utils.activity_logger import ActivityLogger
+
+
+@pytest.fixture
+def activity_logger(tmp_path):
+    logger = ActivityLogger(log_dir=str(tmp_path))
+    yield logger
+    logger.close()
+
+
+def test_time_filter_survives_clock_going_back(activity_logger):
+    # Часы переведены назад: поздние записи получили более раннее время
+    timestamps = ['2026-10-25T02:30:00', '2026-10-25T02:50:00',
+                  '2026-10-25T02:10:00', '2026-10-25T02:40:00']
+    for i, timestamp in enumerate(timestamps):
+        activity_logger.writer.put((timestamp, 'ВХОД', 'Система', None, f'user{i}', None))
+
+    found = activity_logger.query_history(since='2026-10-25T02:20:00', until='2026-10-25T02:45:00')
+    assert [entry['user'] for entry in found] == ['user3', 'user0']
+
+
+def test_time_filtered_pages_cover_every_entry_once(activity_logger):
+    for i in range(50):
+        timestamp = f'2026-10-25T02:{(i * 7) % 60:02d}:00'
+        activity_logger.writer.put((timestamp, 'ВХОД', 'Система', None, f'user{i}', None))
+
+    pages = list(activity_logger.iter_history(batch_size=7, since='2026-10-25T02:00:00'))
+    assert sorted(entry['id'] for entry in pages) == list(range(1, 51))
+    assert [entry['timestamp'] for entry in pages] == sorted(
+        (entry['timestamp'] for entry in pages), reverse=True
+    )
+
+
+def test_legacy_json_with_missing_fields_is_migrated(tmp_path):
+    history = [
+        {'timestamp': '2024-03-02T10:00:00', 'action': 'ОБНОВЛЕН', 'entity_type': 'Сотрудник',
+         'entity_id': 7, 'user': None, 'details': 'Иванов'},
+        {'timestamp': '2024-03-01T09:00:00', 'action': 'ВХОД', 'entity_type': 'Система',
+         'entity_id': None, 'user': 'admin', 'details': None},
+    ]
+    with open(tmp_path / 'history.json', 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False)
+
+    logger = ActivityLogger(log_dir=str(tmp_path))
+    try:
+        entries = logger.get_recent_history()
+    finally:
+        logger.close()
+
+    assert [(entry['user'], entry['details']) for entry in entries] == [
+        ('system', 'Иванов'), ('admin', None)
+    ]
+    assert not (tmp_path / 'history.json').exists()
+    assert (tmp_path / 'history.json.migrated').exists()
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from database import migrations
+from database.database import Database
+
+
+def test_failed_step_is_rolled_back(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'employees.db')
+
+    def broken_indexes(cursor):
+        migrations._hot_path_indexes(cursor)
+        raise sqlite3.OperationalError('сбой миграции')
+
+    steps = list(migrations.MIGRATIONS)
+    steps[2] = (3, steps[2][1], broken_indexes)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', steps)
+
+    with pytest.raises(sqlite3.OperationalError):
+        Database(db_path)
+
+    connection = sqlite3.connect(db_path)
+    try:
+        assert connection.execute('PRAGMA user_version').fetchone()[0] == 2
+        indexes = {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='index'"
+        )}
+        assert 'idx_employees_name' not in indexes
+    finally:
+        connection.close()
+
+
+def test_migrations_reach_latest_version(database):
+    version = database.connect().execute('PRAGMA user_version').fetchone()[0]
+    assert version == migrations.LATEST_VERSION
@@ -0,0 +1,30 @@
+import os
+import stat
+
+from utils.photo_cache import PhotoCache
+
+
+def test_disk_tier_evicts_least_recently_read(tmp_path):
+    cache = PhotoCache(cache_dir=str(tmp_path), max_disk_bytes=1000)
+    for i in range(5):
+        cache.store(f'key{i}', b'x' * 200)
+        os.utime(tmp_path / f'key{i}.png', (i, i))
+    # Чтение с диска продлевает жизнь самой старой миниатюре
+    cache.clear()
+    assert cache.lookup('key0') is not None
+
+    cache.store('key5', b'x' * 200)
+
+    names = sorted(os.listdir(tmp_path))
+    assert names == ['key0.png', 'key3.png', 'key4.png', 'key5.png']
+
+
+def test_stored_thumbnail_has_default_mode(tmp_path):
+    reference = tmp_path / 'reference'
+    reference.write_bytes(b'')
+    cache = PhotoCache(cache_dir=str(tmp_path))
+    cache.store('key', b'png')
+
+    mode = stat.S_IMODE(os.stat(tmp_path / 'key.png').st_mode)
+    assert mode == stat.S_IMODE(os.stat(reference).st_mode)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
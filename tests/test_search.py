@@ -0,0 +1,57 @@
+from dataclasses import replace
+
+from tests.conftest import make_employee
+
+
+def add(database, i, **fields):
+    employee = replace(make_employee(i), **fields)
+    employee.id = database.add_employee(employee)
+    return employee
+
+
+def found_ids(database, query):
+    return [summary.id for summary in database.search_employee_summaries(query)]
+
+
+def test_fts_matches_word_prefixes(database):
+    assert database.fts_enabled
+    petrov = add(database, 1, last_name='Петров', first_name='Иван')
+    add(database, 2, last_name='Сидоров', first_name='Петр')
+    kuznetsova = add(database, 3, last_name='Кузнецова', first_name='Анна')
+
+    assert found_ids(database, 'Пет Ив') == [petrov.id]
+    assert found_ids(database, 'кузн') == [kuznetsova.id]
+
+
+def test_fts_ranks_name_match_above_skills(database):
+    by_skills = add(database, 1, last_name='Орлов', skills='python')
+    by_name = add(database, 2, last_name='Python')
+
+    assert found_ids(database, 'python') == [by_name.id, by_skills.id]
+
+
+def test_special_input_falls_back_to_like(database):
+    with_email = add(database, 1, email='boss@corp.ru')
+    add(database, 2, email=None)
+
+    # В запросе нет слов - FTS не применим, ищется подстрока
+    assert found_ids(database, '@') == [with_email.id]
+
+
+def test_like_search_without_fts(database):
+    database.fts_enabled = False
+    engineer = add(database, 1, position='Ведущий инженер')
+    add(database, 2, position='Бухгалтер')
+
+    assert found_ids(database, 'инженер') == [engineer.id]
+
+
+def test_triggers_keep_index_in_sync(database):
+    employee = add(database, 1, last_name='Смирнов')
+
+    database.update_employee(replace(employee, last_name='Волков'))
+    assert found_ids(database, 'Смирнов') == []
+    assert found_ids(database, 'Волков') == [employee.id]
+
+    database.delete_employee(employee.id)
+    assert found_ids(database, 'Волков') == []
@@ -0,0 +1,62 @@
+import json
+import os
+import stat
+import threading
+
+from utils.settings_manager import SettingsManager
+
+
+def file_mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_save_keeps_existing_file_mode(tmp_path):
+    settings_file = tmp_path / 'settings.json'
+    settings_file.write_text('{}', encoding='utf-8')
+    os.chmod(settings_file, 0o640)
+
+    manager = SettingsManager(str(settings_file))
+    manager.set('theme', 'dark')
+    assert manager.save_settings()
+
+    assert file_mode(settings_file) == 0o640
+
+
+def test_new_file_gets_umask_default_mode(tmp_path):
+    settings_file = tmp_path / 'settings.json'
+    reference = tmp_path / 'reference'
+    reference.write_text('', encoding='utf-8')
+
+    manager = SettingsManager(str(settings_file))
+    assert manager.save_settings()
+
+    assert file_mode(settings_file) == file_mode(reference)
+
+
+def test_set_does_not_wait_for_disk_write(tmp_path, monkeypatch):
+    manager = SettingsManager(str(tmp_path / 'settings.json'))
+    writing = threading.Event()
+    release = threading.Event()
+    write_atomic = manager._write_atomic
+
+    def slow_write(data):
+        writing.set()
+        release.wait(5)
+        write_atomic(data)
+
+    monkeypatch.setattr(manager, '_write_atomic', slow_write)
+    manager.set('theme', 'dark')
+    flusher = threading.Thread(target=manager.flush)
+    flusher.start()
+    assert writing.wait(5)
+
+    setter = threading.Thread(target=manager.set, args=('theme', 'light'))
+    setter.start()
+    setter.join(1)
+    assert not setter.is_alive()
+
+    release.set()
+    flusher.join(5)
+    assert manager.flush()
+    with open(manager.settings_file, encoding='utf-8') as f:
+        assert json.load(f)['theme'] == 'light'
@@ -0,0 +1,33 @@
+from dataclasses import asdict, replace
+
+from database.cache import DataCache
+from database.models import Department
+from tests.conftest import make_employee
+
+
+def cached_statistics(database):
+    cache = DataCache()
+    cache.set_employees(database.list_employee_summaries())
+    cache.set_statistics(database.get_statistics())
+    return cache
+
+
+def test_patched_statistics_match_recomputed(database):
+    sales = database.add_department(Department(id=None, name='Продажи', parent_id=None, manager_id=None))
+    ids = [database.add_employee(replace(make_employee(i), department_id=sales if i % 2 else None))
+           for i in range(6)]
+    cache = cached_statistics(database)
+
+    added = replace(make_employee(10), department_id=sales, birth_date='1999-05-05',
+                    photo=b'\x89PNG', position='Директор')
+    added_id = database.add_employee(added)
+    cache.upsert_employee(database.get_employee_summary(added_id))
+
+    changed = replace(database.get_employee(ids[0]), department_id=sales, position='Директор')
+    database.update_employee(changed)
+    cache.upsert_employee(database.get_employee_summary(ids[0]))
+
+    database.delete_employee(ids[1])
+    cache.remove_employee(ids[1])
+
+    assert asdict(cache.get_statistics()) == asdict(database.get_statistics())
@@ -1,14 +1,25 @@
-from .main_window import MainWindow
-from .login_dialog import LoginDialog
-from .employee_card import EmployeeCard
-from .dialogs import AddEditEmployeeDialog, AddDepartmentDialog
-from .statistics_widget import StatisticsWidget
-from .advanced_search_dialog import AdvancedSearchDialog
-from .settings_dialog import SettingsDialog
-from .backup_dialog import BackupDialog
+import importlib
 
-__all__ = ['MainWindow', 'LoginDialog', 'EmployeeCard', 
-           'AddEditEmployeeDialog', 'AddDepartmentDialog',
-           'StatisticsWidget', 'AdvancedSearchDialog',
-           'SettingsDialog', 'BackupDialog']
+# Модули окон загружаются при первом обращении: заставка и окно входа
+# не ждут импорта главного окна со всеми его зависимостями
+_EXPORTS = {
+    'MainWindow': 'main_window',
+    'LoginDialog': 'login_dialog',
+    'EmployeeCard': 'employee_card',
+    'AddEditEmployeeDialog': 'dialogs',
+    'AddDepartmentDialog': 'dialogs',
+    'StatisticsWidget': 'statistics_widget',
+    'AdvancedSearchDialog': 'advanced_search_dialog',
+    'SettingsDialog': 'settings_dialog',
+    'BackupDialog': 'backup_dialog',
+}
 
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
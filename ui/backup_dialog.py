@@ -1,13 +1,27 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QListWidget, QListWidgetItem, QLabel, QMessageBox,
-                             QInputDialog)
-from PyQt6.QtCore import Qt
+                             QInputDialog, QProgressBar)
+from PyQt6.QtCore import Qt, pyqtSignal
+from typing import Optional
 from utils.backup_manager import BackupManager
+from .job_runner import JobRunner
 
 class BackupDialog(QDialog):
-    def __init__(self, backup_manager: BackupManager, parent=None):
+    """Резервные копии. Создание и восстановление выполняются в фоне
+    с прогрессом по страницам базы; окно при этом не блокируется"""
+    
+    # Рабочая база заменена копией
+    database_restored = pyqtSignal()
+    
+    def __init__(self, backup_manager: BackupManager, parent=None,
+                 job_runner: Optional[JobRunner] = None):
         super().__init__(parent)
         self.backup_manager = backup_manager
+        self.job_runner = job_runner or JobRunner(self)
+        self._job_id: Optional[int] = None
+        self.job_runner.job_progress.connect(self.on_job_progress)
+        self.job_runner.job_cancelled.connect(self.on_job_cancelled)
+        self._connected = True
         self.setWindowTitle('Управление резервными копиями')
         self.setMinimumSize(600, 400)
         self.init_ui()
@@ -23,19 +37,30 @@ class BackupDialog(QDialog):
         self.backup_list.itemDoubleClicked.connect(self.show_backup_info)
         layout.addWidget(self.backup_list)
         
+        progress_layout = QHBoxLayout()
+        self.progress_label = QLabel()
+        progress_layout.addWidget(self.progress_label)
+        self.progress_bar = QProgressBar()
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton('Отмена')
+        self.cancel_btn.clicked.connect(self.cancel_job)
+        progress_layout.addWidget(self.cancel_btn)
+        layout.addLayout(progress_layout)
+        self.set_progress_visible(False)
+        
         button_layout = QHBoxLayout()
         
-        create_btn = QPushButton('Создать копию')
-        create_btn.clicked.connect(self.create_backup)
-        button_layout.addWidget(create_btn)
+        self.create_btn = QPushButton('Создать копию')
+        self.create_btn.clicked.connect(self.create_backup)
+        button_layout.addWidget(self.create_btn)
         
-        restore_btn = QPushButton('Восстановить')
-        restore_btn.clicked.connect(self.restore_backup)
-        button_layout.addWidget(restore_btn)
+        self.restore_btn = QPushButton('Восстановить')
+        self.restore_btn.clicked.connect(self.restore_backup)
+        button_layout.addWidget(self.restore_btn)
         
-        delete_btn = QPushButton('Удалить')
-        delete_btn.clicked.connect(self.delete_backup)
-        button_layout.addWidget(delete_btn)
+        self.delete_btn = QPushButton('Удалить')
+        self.delete_btn.clicked.connect(self.delete_backup)
+        button_layout.addWidget(self.delete_btn)
         
         button_layout.addStretch()
         
@@ -67,6 +92,66 @@ class BackupDialog(QDialog):
             item.setFlags(Qt.ItemFlag.NoItemFlags)
             self.backup_list.addItem(item)
     
+    def set_progress_visible(self, visible: bool):
+        for widget in (self.progress_label, self.progress_bar, self.cancel_btn):
+            widget.setVisible(visible)
+    
+    def run_job(self, title: str, func, on_finished, error_title: str):
+        """Фоновая операция с прогрессом в окне; кнопки блокируются до ее конца"""
+        for button in (self.create_btn, self.restore_btn, self.delete_btn):
+            button.setEnabled(False)
+        self.progress_label.setText(title)
+        self.progress_bar.setRange(0, 0)
+        self.cancel_btn.setEnabled(True)
+        self.set_progress_visible(True)
+        
+        def finished(result):
+            self.job_done()
+            on_finished(result)
+        
+        def failed(message):
+            self.job_done()
+            QMessageBox.critical(self, error_title, message)
+        
+        self._job_id = self.job_runner.submit(title, func, on_finished=finished, on_failed=failed)
+    
+    def on_job_progress(self, job_id: int, done: int, total: int, message: str):
+        if job_id != self._job_id:
+            return
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+    
+    def on_job_cancelled(self, job_id: int):
+        if job_id == self._job_id:
+            self.job_done()
+    
+    def job_done(self):
+        self._job_id = None
+        for button in (self.create_btn, self.restore_btn, self.delete_btn):
+            button.setEnabled(True)
+        self.set_progress_visible(False)
+        self.load_backups()
+    
+    def cancel_job(self):
+        if self._job_id is not None:
+            self.job_runner.cancel(self._job_id)
+            self.cancel_btn.setEnabled(False)
+    
+    def done(self, result):
+        # Копия дописывается во временный файл, поэтому отмена безопасна;
+        # восстановление откатывается целиком
+        if self._job_id is not None:
+            self.job_runner.cancel(self._job_id)
+            self.job_runner.wait_for_done()
+        # Сигналы исполнителя общие на все приложение: закрытое окно не
+        # должно получать прогресс последующих задач
+        if self._connected:
+            self.job_runner.job_progress.disconnect(self.on_job_progress)
+            self.job_runner.job_cancelled.disconnect(self.on_job_cancelled)
+            self._connected = False
+        super().done(result)
+    
     def create_backup(self):
         comment, ok = QInputDialog.getText(
             self,
@@ -75,18 +160,19 @@ class BackupDialog(QDialog):
         )
         
         if ok:
-            try:
-                backup_path = self.backup_manager.create_backup(
-                    comment if comment.strip() else None
-                )
-                QMessageBox.information(
+            self.run_job(
+                'Создание резервной копии',
+                lambda context: self.backup_manager.create_backup(
+                    comment if comment.strip() else None,
+                    progress_callback=context.progress
+                ),
+                lambda backup_path: QMessageBox.information(
                     self,
                     'Успех',
                     f'Резервная копия создана:\n{backup_path}'
-                )
-                self.load_backups()
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', str(e))
+                ),
+                'Ошибка'
+            )
     
     def restore_backup(self):
         current_item = self.backup_list.currentItem()
@@ -109,16 +195,22 @@ class BackupDialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                self.backup_manager.restore_backup(backup['path'])
-                QMessageBox.information(
-                    self,
-                    'Успех',
-                    'База данных восстановлена!\nПерезапустите приложение для применения изменений.'
-                )
+            def restored(result):
+                if not result:
+                    QMessageBox.warning(self, 'Ошибка', 'Файл резервной копии не найден!')
+                    return
+                self.database_restored.emit()
+                QMessageBox.information(self, 'Успех', 'База данных восстановлена!')
                 self.accept()
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', str(e))
+            
+            self.run_job(
+                'Восстановление базы данных',
+                lambda context: self.backup_manager.restore_backup(
+                    backup['path'], progress_callback=context.progress
+                ),
+                restored,
+                'Ошибка'
+            )
     
     def delete_backup(self):
         current_item = self.backup_list.currentItem()
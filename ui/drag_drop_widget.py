@@ -35,7 +35,7 @@ class DragDropImportWidget(QWidget):
             urls = event.mimeData().urls()
             for url in urls:
                 file_path = url.toLocalFile()
-                if file_path.lower().endswith(('.csv', '.xlsx', '.xls')):
+                if file_path.lower().endswith(('.csv', '.xlsx')):
                     event.acceptProposedAction()
                     self.is_dragging = True
                     self.label.setStyleSheet("""
@@ -67,7 +67,7 @@ class DragDropImportWidget(QWidget):
         files = []
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
-            if file_path.lower().endswith(('.csv', '.xlsx', '.xls')):
+            if file_path.lower().endswith(('.csv', '.xlsx')):
                 files.append(file_path)
         
         if files:
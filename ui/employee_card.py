@@ -4,6 +4,7 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QPixmap, QFont
 from database.models import Employee
 from database.database import Database
+from utils.photo_cache import get_photo_cache
 
 class EmployeeCard(QWidget):
     call_requested = pyqtSignal(str)
@@ -33,8 +34,9 @@ class EmployeeCard(QWidget):
         photo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         if self.employee.photo:
+            thumbnail = get_photo_cache().get(self.employee.photo, (150, 150))
             pixmap = QPixmap()
-            pixmap.loadFromData(self.employee.photo)
+            pixmap.loadFromData(thumbnail or self.employee.photo)
             scaled_pixmap = pixmap.scaled(150, 150, Qt.AspectRatioMode.KeepAspectRatio, 
                                          Qt.TransformationMode.SmoothTransformation)
             photo_label.setPixmap(scaled_pixmap)
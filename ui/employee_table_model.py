@@ -0,0 +1,199 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from typing import Dict, List, Optional
+
+EMPLOYEE_ID_ROLE = Qt.ItemDataRole.UserRole
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+class EmployeeTableModel(QAbstractTableModel):
+    """Модель таблицы сотрудников поверх колоночного снимка списка.
+
+    Строки не материализуются в виде элементов: представление запрашивает
+    только видимые ячейки, поэтому обновление стоит O(n) по данным, а не по
+    количеству создаваемых объектов Qt.
+    """
+
+    HEADERS = ['ID', 'ФИО', 'Должность', 'Отдел', 'Телефон', 'Email']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns: List[list] = [[] for _ in self.HEADERS]
+        self._sort_names: list = []
+        self._row_by_id: Dict[int, int] = {}
+
+    def set_employees(self, employees, department_names: Dict[int, str]):
+        self.beginResetModel()
+        columns = [[] for _ in self.HEADERS]
+        sort_names = []
+
+        for employee in employees:
+            values = self._row_values(employee, department_names)
+            for column, value in zip(columns, values):
+                column.append(value)
+            sort_names.append(values[1].lower())
+
+        self._columns = columns
+        self._sort_names = sort_names
+        self._row_by_id = {emp_id: row for row, emp_id in enumerate(columns[0])}
+        self.endResetModel()
+
+    def update_employees(self, employees, department_names: Dict[int, str]):
+        """Приводит модель к новому списку без сброса: исчезнувшие строки
+        удаляются, изменившиеся обновляются, новые добавляются, затем строки
+        переставляются в порядке списка (например, по релевантности поиска).
+        Выделение и прокрутка представления при этом сохраняются"""
+        new_values = {}
+        for employee in employees:
+            new_values[employee.id] = self._row_values(employee, department_names)
+
+        # Удаляем с конца непрерывными участками, чтобы номера еще не
+        # обработанных строк не сдвигались
+        row = len(self._columns[0]) - 1
+        while row >= 0:
+            if self._columns[0][row] in new_values:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._columns[0][row] not in new_values:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            for column in self._columns:
+                del column[row + 1:last + 1]
+            del self._sort_names[row + 1:last + 1]
+            self.endRemoveRows()
+        self._row_by_id = {emp_id: row for row, emp_id in enumerate(self._columns[0])}
+
+        last_column = len(self.HEADERS) - 1
+        for row, emp_id in enumerate(self._columns[0]):
+            values = new_values.pop(emp_id)
+            if any(column[row] != value for column, value in zip(self._columns, values)):
+                for column, value in zip(self._columns, values):
+                    column[row] = value
+                self._sort_names[row] = values[1].lower()
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+        if new_values:
+            first = len(self._columns[0])
+            self.beginInsertRows(QModelIndex(), first, first + len(new_values) - 1)
+            for emp_id, values in new_values.items():
+                for column, value in zip(self._columns, values):
+                    column.append(value)
+                self._sort_names.append(values[1].lower())
+                self._row_by_id[emp_id] = len(self._columns[0]) - 1
+            self.endInsertRows()
+
+        order = [self._row_by_id[emp_id] for emp_id in dict.fromkeys(emp.id for emp in employees)]
+        if order != list(range(len(order))):
+            self._reorder(order)
+
+    def _reorder(self, order: List[int]):
+        """Перестановка строк: order[i] - прежний номер строки, которая
+        становится i-й. Постоянные индексы (выделение) переносятся вслед"""
+        self.layoutAboutToBeChanged.emit()
+        new_row = {old: new for new, old in enumerate(order)}
+        self._columns = [[column[row] for row in order] for column in self._columns]
+        self._sort_names = [self._sort_names[row] for row in order]
+        self._row_by_id = {emp_id: row for row, emp_id in enumerate(self._columns[0])}
+
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(new_row[index.row()], index.column()) for index in old_indexes]
+        )
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def _row_values(employee, department_names: Dict[int, str]) -> tuple:
+        full_name = f"{employee.last_name} {employee.first_name}"
+        if employee.middle_name:
+            full_name += f" {employee.middle_name}"
+
+        return (employee.id, full_name, employee.position or '-',
+                department_names.get(employee.department_id, '-'),
+                employee.work_phone or employee.mobile_phone or '-',
+                employee.email or '-')
+
+    def upsert_employee(self, employee, department_names: Dict[int, str]):
+        """Обновляет строку сотрудника или добавляет ее в конец модели
+        (порядок отображения задает прокси-модель сортировки)"""
+        values = self._row_values(employee, department_names)
+        row = self._row_by_id.get(employee.id)
+
+        if row is None:
+            row = len(self._columns[0])
+            self.beginInsertRows(QModelIndex(), row, row)
+            for column, value in zip(self._columns, values):
+                column.append(value)
+            self._sort_names.append(values[1].lower())
+            self._row_by_id[employee.id] = row
+            self.endInsertRows()
+            return
+
+        for column, value in zip(self._columns, values):
+            column[row] = value
+        self._sort_names[row] = values[1].lower()
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def remove_employee(self, employee_id: int):
+        row = self._row_by_id.get(employee_id)
+        if row is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        for column in self._columns:
+            del column[row]
+        del self._sort_names[row]
+        del self._row_by_id[employee_id]
+        for following, emp_id in enumerate(self._columns[0][row:], start=row):
+            self._row_by_id[emp_id] = following
+        self.endRemoveRows()
+
+    def employee_id(self, row: int) -> Optional[int]:
+        if 0 <= row < len(self._columns[0]):
+            return self._columns[0][row]
+        return None
+
+    def row_for_id(self, employee_id: int) -> Optional[int]:
+        return self._row_by_id.get(employee_id)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self._columns[column][row]
+            return str(value) if column == 0 else value
+        if role == SORT_ROLE:
+            if column == 1:
+                return self._sort_names[row]
+            return self._columns[column][row]
+        if role == EMPLOYEE_ID_ROLE:
+            return self._columns[0][row]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class EmployeeSortProxyModel(QSortFilterProxyModel):
+    """Сортировка по подготовленным ключам модели (ID как число, ФИО без регистра)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+
+    def employee_id(self, proxy_row: int) -> Optional[int]:
+        source_index = self.mapToSource(self.index(proxy_row, 0))
+        return self.sourceModel().employee_id(source_index.row())
@@ -1,12 +1,24 @@
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QPushButton, QLabel, QComboBox,
-                             QLineEdit, QHeaderView)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QLabel, QComboBox, QLineEdit, QHeaderView)
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from utils.activity_logger import ActivityLogger
-from datetime import datetime
+from .history_table_model import HistoryTableModel
+from datetime import datetime, timedelta
+
+# (подпись, длительность периода); None - за все время
+PERIODS = [
+    ('За все время', None),
+    ('За сегодня', timedelta(0)),
+    ('За 7 дней', timedelta(days=7)),
+    ('За 30 дней', timedelta(days=30)),
+    ('За год', timedelta(days=365)),
+]
 
 class HistoryDialog(QDialog):
+    """История изменений. Фильтры выполняются запросом к журналу,
+    а таблица догружает страницы по мере прокрутки"""
+    
     def __init__(self, logger: ActivityLogger, parent=None):
         super().__init__(parent)
         self.logger = logger
@@ -21,7 +33,7 @@ class HistoryDialog(QDialog):
             QDialog {
                 background-color: #f5f6fa;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 alternate-background-color: #f8f9fa;
                 gridline-color: #e1e8ed;
@@ -83,47 +95,53 @@ class HistoryDialog(QDialog):
         self.action_filter = QComboBox()
         self.action_filter.addItem('Все действия', None)
         self.action_filter.addItems(['ДОБАВЛЕН', 'ОБНОВЛЕН', 'УДАЛЕН', 'ЭКСПОРТ', 'ИМПОРТ', 'ПОИСК', 'ВХОД'])
-        self.action_filter.currentIndexChanged.connect(self.apply_filters)
+        self.action_filter.currentIndexChanged.connect(self.load_history)
         filter_layout.addWidget(QLabel('Действие:'))
         filter_layout.addWidget(self.action_filter)
         
         self.type_filter = QComboBox()
         self.type_filter.addItem('Все типы', None)
         self.type_filter.addItems(['Сотрудник', 'Отдел', 'Система'])
-        self.type_filter.currentIndexChanged.connect(self.apply_filters)
+        self.type_filter.currentIndexChanged.connect(self.load_history)
         filter_layout.addWidget(QLabel('Тип:'))
         filter_layout.addWidget(self.type_filter)
         
         self.user_filter = QLineEdit()
         self.user_filter.setPlaceholderText('Фильтр по пользователю...')
-        self.user_filter.textChanged.connect(self.apply_filters)
+        # Запрос выполняется после паузы в наборе, а не на каждую букву
+        self.user_filter_timer = QTimer(self)
+        self.user_filter_timer.setSingleShot(True)
+        self.user_filter_timer.setInterval(300)
+        self.user_filter_timer.timeout.connect(self.load_history)
+        self.user_filter.textChanged.connect(lambda text: self.user_filter_timer.start())
         filter_layout.addWidget(QLabel('Пользователь:'))
         filter_layout.addWidget(self.user_filter)
         
+        self.period_filter = QComboBox()
+        for label, period in PERIODS:
+            self.period_filter.addItem(label, period)
+        self.period_filter.currentIndexChanged.connect(self.load_history)
+        filter_layout.addWidget(QLabel('Период:'))
+        filter_layout.addWidget(self.period_filter)
+        
         filter_layout.addStretch()
         layout.addLayout(filter_layout)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            '🕐 Время',
-            '🎯 Действие',
-            '📋 Тип',
-            '🔢 ID',
-            '👤 Пользователь',
-            '📝 Детали'
-        ])
+        self.history_model = HistoryTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.history_model)
         
+        # ResizeToContents измерял бы каждую загруженную строку;
+        # ширины задаются один раз, растягивается только столбец деталей
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
+        for column, width in enumerate([150, 110, 110, 60, 130]):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Interactive)
+            header.resizeSection(column, width)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setDefaultSectionSize(28)
         
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         
         layout.addWidget(self.table)
         
@@ -147,48 +165,25 @@ class HistoryDialog(QDialog):
         
         self.setLayout(layout)
     
-    def load_history(self, limit=200):
-        self.all_history = self.logger.get_recent_history(limit)
-        self.apply_filters()
+    def current_filters(self) -> dict:
+        filters = {
+            # Первый пункт списков - "все"
+            'action': self.action_filter.currentText() if self.action_filter.currentIndex() > 0 else None,
+            'entity_type': self.type_filter.currentText() if self.type_filter.currentIndex() > 0 else None,
+            'user_contains': self.user_filter.text().strip() or None,
+        }
+        
+        period = self.period_filter.currentData()
+        if period is not None:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            filters['since'] = (today - period).isoformat()
+        return filters
     
-    def apply_filters(self):
-        filtered_history = self.all_history
-        
-        action = self.action_filter.currentText()
-        if action != 'Все действия':
-            filtered_history = [h for h in filtered_history if h['action'] == action]
-        
-        entity_type = self.type_filter.currentText()
-        if entity_type != 'Все типы':
-            filtered_history = [h for h in filtered_history if h['entity_type'] == entity_type]
-        
-        user = self.user_filter.text().strip().lower()
-        if user:
-            filtered_history = [h for h in filtered_history if user in h['user'].lower()]
-        
-        self.display_history(filtered_history)
-    
-    def display_history(self, history):
-        self.table.setRowCount(len(history))
-        
-        for row, entry in enumerate(history):
-            timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-            
-            self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-            
-            action_item = QTableWidgetItem(entry['action'])
-            if entry['action'] == 'ДОБАВЛЕН':
-                action_item.setForeground(Qt.GlobalColor.darkGreen)
-            elif entry['action'] == 'УДАЛЕН':
-                action_item.setForeground(Qt.GlobalColor.red)
-            elif entry['action'] == 'ОБНОВЛЕН':
-                action_item.setForeground(Qt.GlobalColor.blue)
-            self.table.setItem(row, 1, action_item)
-            
-            self.table.setItem(row, 2, QTableWidgetItem(entry['entity_type']))
-            self.table.setItem(row, 3, QTableWidgetItem(str(entry['entity_id']) if entry['entity_id'] else '-'))
-            self.table.setItem(row, 4, QTableWidgetItem(entry['user']))
-            self.table.setItem(row, 5, QTableWidgetItem(entry['details'] or '-'))
+    def load_history(self):
+        filters = self.current_filters()
+        self.history_model.set_source(
+            lambda before_id, limit: self.logger.query_history(limit=limit, before_id=before_id, **filters)
+        )
     
     def export_history(self):
         from PyQt6.QtWidgets import QFileDialog
@@ -206,8 +201,9 @@ class HistoryDialog(QDialog):
                 writer = csv.writer(f)
                 writer.writerow(['Время', 'Действие', 'Тип', 'ID', 'Пользователь', 'Детали'])
                 
-                for entry in self.all_history:
-                    timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+                # Вся отфильтрованная выборка, порциями из журнала
+                for entry in self.logger.iter_history(**self.current_filters()):
+                    timestamp = (entry['timestamp'] or '')[:19].replace('T', ' ')
                     writer.writerow([
                         timestamp,
                         entry['action'],
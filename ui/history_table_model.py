@@ -0,0 +1,93 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from typing import Callable, List, Optional
+
+ACTION_COLORS = {
+    'ДОБАВЛЕН': QColor(Qt.GlobalColor.darkGreen),
+    'УДАЛЕН': QColor(Qt.GlobalColor.red),
+    'ОБНОВЛЕН': QColor(Qt.GlobalColor.blue),
+}
+
+class HistoryTableModel(QAbstractTableModel):
+    """Ленивая модель истории: записи догружаются страницами по мере
+    прокрутки (canFetchMore/fetchMore), фильтры выполняет хранилище.
+
+    fetch_page(before_id, limit) возвращает следующую страницу записей,
+    новые первыми; before_id=None - первая страница.
+    """
+
+    HEADERS = ['🕐 Время', '🎯 Действие', '📋 Тип', '🔢 ID', '👤 Пользователь', '📝 Детали']
+
+    def __init__(self, fetch_page: Optional[Callable[[Optional[int], int], list]] = None,
+                 page_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self._fetch_page = fetch_page
+        self._rows: List[dict] = []
+        self._exhausted = fetch_page is None
+
+    def set_source(self, fetch_page: Callable[[Optional[int], int], list]):
+        """Новый набор фильтров: модель сбрасывается и читает первую страницу"""
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        before_id = self._rows[-1]['id'] if self._rows else None
+        page = self._fetch_page(before_id, self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        entry = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                # ISO-время без разбора в datetime: отрезаем доли секунды
+                return (entry['timestamp'] or '')[:19].replace('T', ' ')
+            if column == 1:
+                return entry['action']
+            if column == 2:
+                return entry['entity_type']
+            if column == 3:
+                return str(entry['entity_id']) if entry['entity_id'] else '-'
+            if column == 4:
+                return entry['user']
+            if column == 5:
+                return entry['details'] or '-'
+
+        if role == Qt.ItemDataRole.ForegroundRole and column == 1:
+            return ACTION_COLORS.get(entry['action'])
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
@@ -0,0 +1,206 @@
+import logging
+from typing import Callable, Dict, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QProgressBar, QPushButton
+from utils.jobs import CancellationToken, JobCancelled, JobContext
+
+logger = logging.getLogger(__name__)
+
+class JobSignals(QObject):
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, int, int, str)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+class JobWorker(QRunnable):
+    def __init__(self, job_id: int, func: Callable[[JobContext], object],
+                 token: CancellationToken, signals: JobSignals):
+        super().__init__()
+        self.job_id = job_id
+        self.func = func
+        self.token = token
+        self.signals = signals
+
+    def run(self):
+        # Задачу могли отменить, пока она ждала в очереди
+        if self.token.cancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+
+        self.signals.started.emit(self.job_id)
+        context = JobContext(
+            self.token,
+            lambda done, total, message: self.signals.progress.emit(self.job_id, done, total, message)
+        )
+
+        try:
+            result = self.func(context)
+        except JobCancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            logger.exception('Job %s failed', self.job_id)
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+class JobRunner(QObject):
+    """Очередь фоновых задач (экспорт, импорт): выполняются в пуле потоков,
+    сообщают о прогрессе и могут быть отменены.
+
+    Обработчики on_finished/on_failed вызываются в потоке интерфейса.
+    """
+
+    job_added = pyqtSignal(int, str)
+    job_started = pyqtSignal(int)
+    job_progress = pyqtSignal(int, int, int, str)
+    job_finished = pyqtSignal(int, object)
+    job_failed = pyqtSignal(int, str)
+    job_cancelled = pyqtSignal(int)
+
+    def __init__(self, parent=None, max_workers: int = 1):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        # Потоки не завершаются по простою, чтобы не плодить соединения SQLite
+        self._pool.setExpiryTimeout(-1)
+        self._next_id = 0
+        self._jobs: Dict[int, dict] = {}
+
+    def submit(self, title: str, func: Callable[[JobContext], object],
+               on_finished: Optional[Callable[[object], None]] = None,
+               on_failed: Optional[Callable[[str], None]] = None) -> int:
+        self._next_id += 1
+        job_id = self._next_id
+
+        token = CancellationToken()
+        signals = JobSignals()
+        signals.started.connect(self.job_started)
+        signals.progress.connect(self.job_progress)
+        signals.finished.connect(self._on_finished)
+        signals.failed.connect(self._on_failed)
+        signals.cancelled.connect(self._on_cancelled)
+
+        self._jobs[job_id] = {
+            'title': title,
+            'token': token,
+            'signals': signals,
+            'on_finished': on_finished,
+            'on_failed': on_failed,
+        }
+        self.job_added.emit(job_id, title)
+        self._pool.start(JobWorker(job_id, func, token, signals))
+        return job_id
+
+    def title(self, job_id: int) -> str:
+        job = self._jobs.get(job_id)
+        return job['title'] if job else ''
+
+    def pending_count(self) -> int:
+        return len(self._jobs)
+
+    def cancel(self, job_id: int):
+        job = self._jobs.get(job_id)
+        if job:
+            job['token'].cancel()
+
+    def cancel_all(self):
+        for job in self._jobs.values():
+            job['token'].cancel()
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_finished(self, job_id: int, result):
+        job = self._jobs.pop(job_id, None)
+        self.job_finished.emit(job_id, result)
+        if job and job['on_finished']:
+            job['on_finished'](result)
+
+    def _on_failed(self, job_id: int, message: str):
+        job = self._jobs.pop(job_id, None)
+        self.job_failed.emit(job_id, message)
+        if job and job['on_failed']:
+            job['on_failed'](message)
+
+    def _on_cancelled(self, job_id: int):
+        self._jobs.pop(job_id, None)
+        self.job_cancelled.emit(job_id)
+
+class JobStatusPanel(QWidget):
+    """Панель строки состояния: текущая задача, прогресс, очередь и отмена"""
+
+    def __init__(self, runner: JobRunner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self._current_id: Optional[int] = None
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.title_label = QLabel()
+        layout.addWidget(self.title_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setMaximumHeight(16)
+        layout.addWidget(self.progress_bar)
+
+        self.cancel_button = QPushButton('Отмена')
+        self.cancel_button.clicked.connect(self.cancel_current)
+        layout.addWidget(self.cancel_button)
+
+        self.setLayout(layout)
+        self.hide()
+
+        runner.job_added.connect(lambda job_id, title: self.refresh())
+        runner.job_started.connect(self.on_job_started)
+        runner.job_progress.connect(self.on_job_progress)
+        runner.job_finished.connect(lambda job_id, result: self.on_job_done(job_id))
+        runner.job_failed.connect(lambda job_id, message: self.on_job_done(job_id))
+        runner.job_cancelled.connect(self.on_job_done)
+
+    def on_job_started(self, job_id: int):
+        self._current_id = job_id
+        # Пока объем неизвестен, индикатор показывает занятость
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFormat('')
+        self.refresh()
+
+    def on_job_progress(self, job_id: int, done: int, total: int, message: str):
+        if job_id != self._current_id:
+            return
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+            self.progress_bar.setFormat(f'{done} / {total}')
+        else:
+            self.progress_bar.setRange(0, 0)
+        title = self._title_text()
+        self.title_label.setText(f'{title}: {message}' if message else title)
+
+    def on_job_done(self, job_id: int):
+        if job_id == self._current_id:
+            self._current_id = None
+        self.refresh()
+
+    def cancel_current(self):
+        if self._current_id is not None:
+            self.runner.cancel(self._current_id)
+            self.cancel_button.setEnabled(False)
+
+    def refresh(self):
+        if self.runner.pending_count() == 0:
+            self.hide()
+            return
+
+        self.cancel_button.setEnabled(self._current_id is not None)
+        self.title_label.setText(self._title_text())
+        self.show()
+
+    def _title_text(self) -> str:
+        title = self.runner.title(self._current_id) if self._current_id is not None else 'Ожидание'
+        queued = self.runner.pending_count() - (1 if self._current_id is not None else 0)
+        if queued > 0:
+            title += f' (+{queued} в очереди)'
+        return title
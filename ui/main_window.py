@@ -1,20 +1,20 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QTableWidget, QTableWidgetItem, QPushButton, QLineEdit,
+                             QTableView, QPushButton, QLineEdit,
                              QTreeWidget, QTreeWidgetItem, QSplitter, QMessageBox,
                              QFileDialog, QLabel, QComboBox, QMenu, QGraphicsOpacityEffect)
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, pyqtSignal
 from PyQt6.QtGui import QPixmap, QAction, QDesktopServices
+from .employee_table_model import EmployeeTableModel, EmployeeSortProxyModel
+from .search_worker import SearchController
+from .job_runner import JobRunner, JobStatusPanel
 from .modern_widgets import ModernSearchBox, IconButton, AnimatedButton, ModernCard
 from .styles import get_main_stylesheet
-from database.database import Database
+from database.database import Database, EVENT_UPSERT, EVENT_RELOAD
 from database.models import Employee
 from auth.auth import AuthManager
-from utils.export_import import ExportImport
-from utils.qr_generator import QRGenerator
-from utils.card_generator import CardGenerator
-from utils.export_json import JSONExporter
 from utils.backup_manager import BackupManager
 from utils.settings_manager import SettingsManager
+from utils.jobs import JobCancelled
 from database.cache import DataCache
 from .dialogs import AddEditEmployeeDialog, AddDepartmentDialog
 from .employee_card import EmployeeCard
@@ -22,10 +22,19 @@ from .statistics_widget import StatisticsWidget
 from .advanced_search_dialog import AdvancedSearchDialog
 from .settings_dialog import SettingsDialog
 from .backup_dialog import BackupDialog
+import os
 import webbrowser
 from datetime import datetime
+from functools import cached_property
+
+# При большем числе накопленных изменений дешевле перечитать список целиком
+CHANGE_BATCH_RELOAD_THRESHOLD = 500
 
 class MainWindow(QMainWindow):
+    # Изменения сотрудников из Database; сигнал переносит их в поток
+    # интерфейса, даже если изменение выполнено в рабочем потоке
+    employee_changed = pyqtSignal(str, object)
+    
     def __init__(self, database: Database, auth_manager: AuthManager):
         super().__init__()
         try:
@@ -38,23 +47,34 @@ class MainWindow(QMainWindow):
             
             logger.info("MainWindow: Creating managers...")
             self.settings_manager = SettingsManager()
-            self.backup_manager = BackupManager('employees.db')
-            self.export_import = ExportImport(database)
-            self.qr_generator = QRGenerator()
-            self.card_generator = CardGenerator()
-            self.json_exporter = JSONExporter()
+            # Копируется тот же файл, с которым работает приложение
+            self.backup_manager = BackupManager(self.database.db_path)
             
             cache_ttl = self.settings_manager.get('cache_ttl', 300)
             self.cache = DataCache(ttl_seconds=cache_ttl)
             
             self.current_employees = []
+            # Текущее представление таблицы: условие отбора строк (None - все
+            # сотрудники) или функция повторного запроса для результатов поиска
+            self._view_filter = None
+            self._view_refresh = None
+            # Сортировка таблицы на время показа результатов поиска
+            self._saved_sort = None
+            
+            self._pending_changes = {}
+            self._reload_pending = False
+            self._changes_timer = QTimer(self)
+            self._changes_timer.setSingleShot(True)
+            self._changes_timer.timeout.connect(self.apply_employee_changes)
+            self.employee_changed.connect(self.queue_employee_change)
+            self.database.add_change_listener(self.employee_changed.emit)
             
             logger.info("MainWindow: Setting up UI...")
             self.init_ui()
             logger.info("MainWindow: Loading data...")
             self.load_data()
-            logger.info("MainWindow: Checking birthdays...")
-            self.check_birthdays()
+            # Напоминание модальное: показываем его после первой отрисовки окна
+            QTimer.singleShot(0, self.check_birthdays)
             logger.info("MainWindow: Initialization complete!")
         except Exception as e:
             import traceback
@@ -64,6 +84,28 @@ class MainWindow(QMainWindow):
             logger.error(error_msg, exc_info=True)
             raise
     
+    # Экспорт, отчеты и QR-коды загружают reportlab, openpyxl, PIL и qrcode;
+    # модули импортируются при первом использовании, а не при запуске
+    @cached_property
+    def export_import(self):
+        from utils.export_import import ExportImport
+        return ExportImport(self.database)
+    
+    @cached_property
+    def qr_generator(self):
+        from utils.qr_generator import QRGenerator
+        return QRGenerator()
+    
+    @cached_property
+    def card_generator(self):
+        from utils.card_generator import CardGenerator
+        return CardGenerator()
+    
+    @cached_property
+    def json_exporter(self):
+        from utils.export_json import JSONExporter
+        return JSONExporter()
+    
     def init_ui(self):
         self.setWindowTitle('👥 Employee Directory')
         self.setGeometry(100, 100, 1400, 850)
@@ -74,6 +116,13 @@ class MainWindow(QMainWindow):
         self.apply_modern_styles()
         self.statusBar().showMessage('✅ Готов к работе • Нажмите F1 для справки')
         
+        self.job_runner = JobRunner(self)
+        self.job_runner.job_cancelled.connect(
+            lambda job_id: self.statusBar().showMessage('Задача отменена', 3000)
+        )
+        self.job_status_panel = JobStatusPanel(self.job_runner)
+        self.statusBar().addPermanentWidget(self.job_status_panel)
+        
         # Анимация появления окна
         self.fade_in_animation()
         
@@ -97,7 +146,7 @@ class MainWindow(QMainWindow):
         self.employee_card_widget.setLayout(self.employee_card_layout)
         right_panel.addWidget(self.employee_card_widget)
         
-        self.statistics_widget = StatisticsWidget(self.database)
+        self.statistics_widget = StatisticsWidget(self.database, self.ensure_statistics_cached)
         self.statistics_widget.setMaximumHeight(300)
         right_panel.addWidget(self.statistics_widget)
         
@@ -371,6 +420,11 @@ class MainWindow(QMainWindow):
         
         self.search_input = ModernSearchBox()
         self.search_input.setPlaceholderText('🔍 Введите ФИО, должность, телефон или email...')
+        self.search_controller = SearchController(self.database, self)
+        self.search_controller.results_ready.connect(self.show_search_results)
+        self.search_controller.search_failed.connect(
+            lambda message: self.statusBar().showMessage(f'Ошибка поиска: {message}', 5000)
+        )
         self.search_input.textChanged.connect(self.search_employees)
         
         self.search_completer = QCompleter()
@@ -400,15 +454,17 @@ class MainWindow(QMainWindow):
         
         center_layout.addLayout(search_layout)
         
-        self.employee_table = QTableWidget()
-        self.employee_table.setColumnCount(6)
-        self.employee_table.setHorizontalHeaderLabels([
-            'ID', 'ФИО', 'Должность', 'Отдел', 'Телефон', 'Email'
-        ])
-        self.employee_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.employee_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.employee_model = EmployeeTableModel(self)
+        self.employee_proxy = EmployeeSortProxyModel(self)
+        self.employee_proxy.setSourceModel(self.employee_model)
+        
+        self.employee_table = QTableView()
+        self.employee_table.setModel(self.employee_proxy)
+        self.employee_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.employee_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.employee_table.setSortingEnabled(True)
-        self.employee_table.itemSelectionChanged.connect(self.show_employee_card)
+        self.employee_table.sortByColumn(1, Qt.SortOrder.AscendingOrder)
+        self.employee_table.selectionModel().selectionChanged.connect(self.show_employee_card)
         self.employee_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.employee_table.customContextMenuRequested.connect(self.show_context_menu)
         self.employee_table.doubleClicked.connect(self.on_table_double_click)
@@ -435,7 +491,7 @@ class MainWindow(QMainWindow):
                 padding: 10px;
             }
             
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #e3f2fd;
             }
             
@@ -461,50 +517,83 @@ class MainWindow(QMainWindow):
         """)
     
     def load_data(self):
-        cached_employees = self.cache.get_employees()
-        if cached_employees is not None:
-            self.current_employees = cached_employees
-        else:
-            self.current_employees = self.database.get_all_employees()
-            self.cache.set_employees(self.current_employees)
-        
-        self.populate_table(self.current_employees)
+        self.show_all_employees()
         self.load_departments()
         self.load_positions()
         self.statistics_widget.update_statistics()
         self.statusBar().showMessage(f'Загружено сотрудников: {len(self.current_employees)}')
     
+    def ensure_employees_cached(self):
+        employees = self.cache.get_employees()
+        if employees is None:
+            employees = self.database.list_employee_summaries()
+            self.cache.set_employees(employees)
+        return employees
+    
+    def ensure_statistics_cached(self):
+        statistics = self.cache.get_statistics()
+        if statistics is None:
+            statistics = self.database.get_statistics()
+            self.cache.set_statistics(statistics)
+        return statistics
+    
+    def query_employees(self, **criteria):
+        self.ensure_employees_cached()
+        return self.cache.query_employees(**criteria)
+    
+    def set_view(self, employees, view_filter=None, view_refresh=None, ranked=False):
+        self._view_filter = view_filter
+        self._view_refresh = view_refresh
+        self.current_employees = employees
+        if ranked:
+            # Результаты поиска приходят на каждое изменение запроса и
+            # пересекаются с предыдущими: модель правится без сброса
+            self.employee_model.update_employees(employees, self.get_department_names(employees))
+            self.show_source_order()
+        else:
+            self.populate_table(employees)
+            self.restore_table_sort()
+    
+    def show_source_order(self):
+        """Строки в порядке модели (по релевантности), без пересортировки;
+        прежняя сортировка запоминается до выхода из поиска"""
+        if self._saved_sort is None:
+            header = self.employee_table.horizontalHeader()
+            self._saved_sort = (header.sortIndicatorSection(), header.sortIndicatorOrder())
+            self.employee_table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
+    
+    def restore_table_sort(self):
+        if self._saved_sort is not None:
+            self.employee_table.sortByColumn(*self._saved_sort)
+            self._saved_sort = None
+    
+    def show_all_employees(self):
+        self.set_view(self.ensure_employees_cached())
+    
+    def get_department_names(self, employees) -> dict:
+        departments = self.cache.get_departments_by_ids(
+            (emp.department_id for emp in employees),
+            loader=self.database.get_departments_by_ids
+        )
+        return {dept_id: dept.name for dept_id, dept in departments.items()}
+    
     def populate_table(self, employees):
-        self.employee_table.setRowCount(0)
-        
-        for employee in employees:
-            row = self.employee_table.rowCount()
-            self.employee_table.insertRow(row)
-            
-            self.employee_table.setItem(row, 0, QTableWidgetItem(str(employee.id)))
-            
-            full_name = f"{employee.last_name} {employee.first_name}"
-            if employee.middle_name:
-                full_name += f" {employee.middle_name}"
-            self.employee_table.setItem(row, 1, QTableWidgetItem(full_name))
-            
-            self.employee_table.setItem(row, 2, QTableWidgetItem(employee.position or '-'))
-            
-            department_name = '-'
-            if employee.department_id:
-                dept = self.database.get_department(employee.department_id)
-                if dept:
-                    department_name = dept.name
-            self.employee_table.setItem(row, 3, QTableWidgetItem(department_name))
-            
-            phone = employee.work_phone or employee.mobile_phone or '-'
-            self.employee_table.setItem(row, 4, QTableWidgetItem(phone))
-            
-            self.employee_table.setItem(row, 5, QTableWidgetItem(employee.email or '-'))
+        self.employee_model.set_employees(employees, self.get_department_names(employees))
+    
+    def selected_employee_id(self):
+        index = self.employee_table.currentIndex()
+        if not index.isValid() or not self.employee_table.selectionModel().hasSelection():
+            return None
+        return self.employee_proxy.employee_id(index.row())
+    
+    def selected_employee_ids(self) -> list:
+        rows = self.employee_table.selectionModel().selectedRows()
+        return [self.employee_proxy.employee_id(index.row()) for index in rows]
     
     def load_departments(self):
         self.department_tree.clear()
         departments = self.database.get_all_departments()
+        self.cache.set_departments(departments)
         
         all_item = QTreeWidgetItem(self.department_tree, ['Все сотрудники'])
         all_item.setData(0, Qt.ItemDataRole.UserRole, None)
@@ -524,51 +613,137 @@ class MainWindow(QMainWindow):
         for child in child_departments:
             self.add_department_to_tree(child, item, all_departments)
     
+    def queue_employee_change(self, event, employee_id):
+        """Накапливает изменения: серия записей (например, импорт)
+        применяется одним проходом после возврата в цикл событий"""
+        if event == EVENT_RELOAD:
+            self._reload_pending = True
+        else:
+            self._pending_changes[employee_id] = event
+        self._changes_timer.start(0)
+    
+    def apply_employee_changes(self):
+        changes, self._pending_changes = self._pending_changes, {}
+        reload, self._reload_pending = self._reload_pending, False
+        
+        if reload or len(changes) > CHANGE_BATCH_RELOAD_THRESHOLD:
+            self.cache.invalidate_employees()
+            self.load_data()
+            return
+        
+        selected_id = self.selected_employee_id()
+        for employee_id, event in changes.items():
+            summary = None
+            if event == EVENT_UPSERT:
+                summary = self.database.get_employee_summary(employee_id)
+            
+            if summary is None:
+                patched = self.cache.remove_employee(employee_id)
+            else:
+                patched = self.cache.upsert_employee(summary)
+            
+            if not patched:
+                # Список еще не загружен в кэш - патчить нечего
+                self.cache.invalidate_employees()
+                self.load_data()
+                return
+            
+            if self._view_refresh is None:
+                self.patch_view(employee_id, summary)
+        
+        if self._view_refresh is not None:
+            # Результаты поиска упорядочены по релевантности: их проще
+            # запросить заново, чем решать, где место измененной строки
+            self._view_refresh()
+        
+        self.refresh_position_filter()
+        self.statistics_widget.update_statistics()
+        if selected_id in changes and changes[selected_id] == EVENT_UPSERT:
+            self.show_employee_card()
+    
+    def patch_view(self, employee_id, summary):
+        """Строка остается в таблице, только если сотрудник подходит под
+        текущий фильтр; переставший подходить убирается"""
+        visible = summary is not None and (self._view_filter is None or self._view_filter(summary))
+        if visible:
+            self.employee_model.upsert_employee(summary, self.get_department_names([summary]))
+            self.patch_current_employees(employee_id, summary)
+        else:
+            self.employee_model.remove_employee(employee_id)
+            self.patch_current_employees(employee_id, None)
+    
+    def patch_current_employees(self, employee_id, summary):
+        # Полный список разделяется с кэшем: запись в нем уже обновлена,
+        # и замена сводится к присваиванию того же объекта
+        for index, employee in enumerate(self.current_employees):
+            if employee.id == employee_id:
+                if summary is None:
+                    del self.current_employees[index]
+                else:
+                    self.current_employees[index] = summary
+                return
+        
+        if summary is not None:
+            self.current_employees.append(summary)
+    
+    def refresh_position_filter(self):
+        positions = self.cache.get_positions()
+        shown = [self.position_filter.itemData(i) for i in range(1, self.position_filter.count())]
+        if positions == shown:
+            return
+        
+        selected = self.position_filter.currentData()
+        self.position_filter.blockSignals(True)
+        self.load_positions()
+        self.position_filter.setCurrentIndex(max(self.position_filter.findData(selected), 0))
+        self.position_filter.blockSignals(False)
+    
     def load_positions(self):
         self.position_filter.clear()
         self.position_filter.addItem('Все должности', None)
         
-        positions = set()
-        for emp in self.database.get_all_employees():
-            if emp.position:
-                positions.add(emp.position)
-        
-        for position in sorted(positions):
+        self.ensure_employees_cached()
+        for position in self.cache.get_positions():
             self.position_filter.addItem(position, position)
     
     def filter_by_department(self, item):
         department_id = item.data(0, Qt.ItemDataRole.UserRole)
         
-        if department_id is None:
-            self.current_employees = self.database.get_all_employees()
-        else:
-            self.current_employees = self.database.filter_employees(department_id=department_id)
-        
-        self.populate_table(self.current_employees)
+        self.set_view(
+            self.query_employees(department_id=department_id),
+            None if department_id is None else (lambda emp: emp.department_id == department_id)
+        )
     
     def apply_filters(self):
         position = self.position_filter.currentData()
+        if not position:
+            self.show_all_employees()
+            return
         
-        if position:
-            self.current_employees = self.database.filter_employees(position=position)
-        else:
-            self.current_employees = self.database.get_all_employees()
-        
-        self.populate_table(self.current_employees)
+        # Как и прежний LIKE '%...%': должность содержит выбранную строку
+        needle = position.casefold()
+        self.set_view(
+            self.query_employees(position_contains=position),
+            lambda emp: needle in (emp.position or '').casefold()
+        )
     
     def search_employees(self):
         query = self.search_input.text().strip()
         
         if not query:
-            self.load_data()
+            self.search_controller.cancel()
+            self.show_all_employees()
             return
         
+        self.search_controller.schedule(query)
+    
+    def show_search_results(self, query, employees):
         if len(query) >= 3:
             self.settings_manager.add_search_to_history(query)
             self.update_search_completer()
         
-        self.current_employees = self.database.search_employees(query)
-        self.populate_table(self.current_employees)
+        self.set_view(employees, view_refresh=lambda: self.search_controller.schedule(query),
+                      ranked=True)
         self.statusBar().showMessage(f'Найдено записей: {len(self.current_employees)}', 3000)
     
     def clear_search(self):
@@ -588,70 +763,79 @@ class MainWindow(QMainWindow):
                 QMessageBox.information(self, 'Поиск', 'Не указаны критерии поиска')
                 return
             
-            employees = self.database.get_all_employees()
-            filtered_employees = []
+            candidates = self.query_employees(
+                department_id=criteria.get('department_id'),
+                position_contains=criteria.get('position'),
+                hire_date_from=criteria.get('hire_date_from'),
+                hire_date_to=criteria.get('hire_date_to'),
+                has_photo=True if 'has_photo' in criteria else None
+            )
             
-            for emp in employees:
-                match = True
-                
-                if 'fio' in criteria:
-                    full_name = f"{emp.last_name} {emp.first_name} {emp.middle_name or ''}".lower()
-                    if criteria['fio'].lower() not in full_name:
-                        match = False
-                
-                if 'department_id' in criteria and emp.department_id != criteria['department_id']:
-                    match = False
-                
-                if 'position' in criteria and emp.position:
-                    if criteria['position'].lower() not in emp.position.lower():
-                        match = False
-                
-                if 'email' in criteria and emp.email:
-                    if criteria['email'].lower() not in emp.email.lower():
-                        match = False
-                
-                if 'phone' in criteria:
-                    phone_match = False
-                    if emp.work_phone and criteria['phone'] in emp.work_phone:
-                        phone_match = True
-                    if emp.mobile_phone and criteria['phone'] in emp.mobile_phone:
-                        phone_match = True
-                    if not phone_match:
-                        match = False
-                
-                if 'skills' in criteria and emp.skills:
-                    if criteria['skills'].lower() not in emp.skills.lower():
-                        match = False
-                
-                if 'hire_date_from' in criteria and emp.hire_date:
-                    if str(emp.hire_date) < criteria['hire_date_from']:
-                        match = False
-                
-                if 'hire_date_to' in criteria and emp.hire_date:
-                    if str(emp.hire_date) > criteria['hire_date_to']:
-                        match = False
-                
-                if 'has_photo' in criteria and not emp.photo:
-                    match = False
-                
-                if match:
-                    filtered_employees.append(emp)
+            # Индексы сужают выборку, условие проверяет остальные критерии
+            # и затем решает, остается ли в результатах измененная запись
+            matches = self.advanced_search_filter(criteria)
+            filtered_employees = [emp for emp in candidates if matches(emp)]
             
-            self.current_employees = filtered_employees
-            self.populate_table(filtered_employees)
+            self.set_view(filtered_employees, matches)
             self.statusBar().showMessage(f'Найдено: {len(filtered_employees)} сотрудников')
             
             if not filtered_employees:
                 QMessageBox.information(self, 'Результаты поиска', 'Сотрудники по указанным критериям не найдены')
     
+    @staticmethod
+    def advanced_search_filter(criteria):
+        department_id = criteria.get('department_id')
+        position = (criteria.get('position') or '').casefold()
+        hire_date_from = criteria.get('hire_date_from')
+        hire_date_to = criteria.get('hire_date_to')
+        has_photo = 'has_photo' in criteria
+        fio = criteria.get('fio', '').lower()
+        email = criteria.get('email', '').lower()
+        phone = criteria.get('phone')
+        skills = criteria.get('skills', '').lower()
+        
+        def matches(emp):
+            if department_id is not None and emp.department_id != department_id:
+                return False
+            
+            if position and position not in (emp.position or '').casefold():
+                return False
+            
+            if hire_date_from or hire_date_to:
+                hire_date = str(emp.hire_date) if emp.hire_date else None
+                if hire_date is None:
+                    return False
+                if hire_date_from and hire_date < hire_date_from:
+                    return False
+                if hire_date_to and hire_date > hire_date_to:
+                    return False
+            
+            if has_photo and not emp.has_photo:
+                return False
+            
+            if fio:
+                full_name = f"{emp.last_name} {emp.first_name} {emp.middle_name or ''}".lower()
+                if fio not in full_name:
+                    return False
+            
+            if email and email not in (emp.email or '').lower():
+                return False
+            
+            if phone and phone not in (emp.work_phone or '') and phone not in (emp.mobile_phone or ''):
+                return False
+            
+            if skills and skills not in (emp.skills or '').lower():
+                return False
+            
+            return True
+        
+        return matches
+    
     def show_employee_card(self):
-        selected_rows = self.employee_table.selectedItems()
-        if not selected_rows:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             return
         
-        row = self.employee_table.currentRow()
-        employee_id = int(self.employee_table.item(row, 0).text())
-        
         employee = self.database.get_employee(employee_id)
         if employee:
             while self.employee_card_layout.count():
@@ -685,8 +869,6 @@ class MainWindow(QMainWindow):
         
         dialog = AddEditEmployeeDialog(self.database)
         if dialog.exec():
-            self.cache.invalidate_employees()
-            self.load_data()
             QMessageBox.information(self, 'Успех', 'Сотрудник успешно добавлен!')
     
     def edit_employee(self):
@@ -694,20 +876,15 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'У вас нет прав для редактирования!')
             return
         
-        selected_rows = self.employee_table.selectedItems()
-        if not selected_rows:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудника для редактирования!')
             return
         
-        row = self.employee_table.currentRow()
-        employee_id = int(self.employee_table.item(row, 0).text())
-        
         employee = self.database.get_employee(employee_id)
         if employee:
             dialog = AddEditEmployeeDialog(self.database, employee)
             if dialog.exec():
-                self.cache.invalidate_employees()
-                self.load_data()
                 QMessageBox.information(self, 'Успех', 'Данные сотрудника обновлены!')
     
     def delete_employee(self):
@@ -715,8 +892,8 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'У вас нет прав для удаления!')
             return
         
-        selected_rows = self.employee_table.selectedItems()
-        if not selected_rows:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудника для удаления!')
             return
         
@@ -728,12 +905,7 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            row = self.employee_table.currentRow()
-            employee_id = int(self.employee_table.item(row, 0).text())
-            
             self.database.delete_employee(employee_id)
-            self.cache.invalidate_employees()
-            self.load_data()
             QMessageBox.information(self, 'Успех', 'Сотрудник удален!')
     
     def add_department(self):
@@ -759,13 +931,30 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            try:
-                count = self.export_import.import_from_csv(filename)
-                self.cache.invalidate_employees()
-                self.load_data()
-                QMessageBox.information(self, 'Успех', f'Импортировано записей: {count}')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось импортировать данные: {str(e)}')
+            self.job_runner.submit(
+                'Импорт CSV',
+                lambda context: self.export_import.import_from_csv(
+                    filename, progress_callback=lambda done: context.progress(done, 0, f'Обработано строк: {done}')
+                ),
+                on_finished=self.show_import_result,
+                on_failed=lambda message: QMessageBox.critical(
+                    self, 'Ошибка', f'Не удалось импортировать данные: {message}'
+                )
+            )
+    
+    def show_import_result(self, result, max_errors: int = 20):
+        message = f'Импортировано записей: {result.inserted}'
+        if not result.errors:
+            QMessageBox.information(self, 'Успех', message)
+            return
+        
+        lines = [f'Строка {error.row}: {error.message}' for error in result.errors[:max_errors]]
+        if len(result.errors) > max_errors:
+            lines.append(f'... и еще {len(result.errors) - max_errors}')
+        QMessageBox.warning(
+            self, 'Импорт завершен с ошибками',
+            f'{message}\nПропущено строк: {len(result.errors)}\n\n' + '\n'.join(lines)
+        )
     
     def import_excel(self):
         if not self.auth_manager.has_permission('add'):
@@ -776,17 +965,20 @@ class MainWindow(QMainWindow):
             self, 
             'Выберите Excel файл', 
             '', 
-            'Excel файлы (*.xlsx *.xls)'
+            'Excel файлы (*.xlsx)'
         )
         
         if filename:
-            try:
-                count = self.export_import.import_from_excel(filename)
-                self.cache.invalidate_employees()
-                self.load_data()
-                QMessageBox.information(self, 'Успех', f'Импортировано записей: {count}')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось импортировать данные: {str(e)}')
+            self.job_runner.submit(
+                'Импорт Excel',
+                lambda context: self.export_import.import_from_excel(
+                    filename, progress_callback=lambda done: context.progress(done, 0, f'Обработано строк: {done}')
+                ),
+                on_finished=self.show_import_result,
+                on_failed=lambda message: QMessageBox.critical(
+                    self, 'Ошибка', f'Не удалось импортировать данные: {message}'
+                )
+            )
     
     def export_csv(self):
         filename, _ = QFileDialog.getSaveFileName(
@@ -797,11 +989,14 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            try:
-                self.export_import.export_to_csv(filename, self.current_employees)
-                QMessageBox.information(self, 'Успех', 'Данные успешно экспортированы!')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать данные: {str(e)}')
+            # Полная выгрузка читается курсором из базы, а не из списка в памяти
+            def export(context):
+                total = self.database.count_employees()
+                return self.export_import.export_to_csv(
+                    filename, progress_callback=lambda done: context.progress(done, total)
+                )
+            
+            self.run_export_job('Экспорт в CSV', filename, export)
     
     def export_excel(self):
         filename, _ = QFileDialog.getSaveFileName(
@@ -812,11 +1007,14 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            try:
-                self.export_import.export_to_excel(filename, self.current_employees)
-                QMessageBox.information(self, 'Успех', 'Данные успешно экспортированы!')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать данные: {str(e)}')
+            # Полная выгрузка читается курсором из базы, а не из списка в памяти
+            def export(context):
+                total = self.database.count_employees()
+                return self.export_import.export_to_excel(
+                    filename, progress_callback=lambda done: context.progress(done, total)
+                )
+            
+            self.run_export_job('Экспорт в Excel', filename, export)
     
     def export_pdf(self):
         filename, _ = QFileDialog.getSaveFileName(
@@ -827,20 +1025,21 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            try:
-                self.export_import.export_to_pdf(filename, self.current_employees)
-                QMessageBox.information(self, 'Успех', 'Данные успешно экспортированы!')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать данные: {str(e)}')
+            employees = list(self.current_employees)
+            self.run_export_job(
+                'Экспорт в PDF', filename,
+                lambda context: self.export_import.export_to_pdf(
+                    filename, employees,
+                    progress_callback=lambda done: context.progress(done, len(employees))
+                )
+            )
     
     def export_business_card(self):
-        selected_rows = self.employee_table.selectedItems()
-        if not selected_rows:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудника для экспорта визитки!')
             return
         
-        row = self.employee_table.currentRow()
-        employee_id = int(self.employee_table.item(row, 0).text())
         employee = self.database.get_employee(employee_id)
         
         if employee:
@@ -873,16 +1072,24 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            try:
-                sheet_data = self.card_generator.generate_contact_sheet(
-                    self.current_employees[:30],
-                    'Список сотрудников'
-                )
+            employees = self.current_employees[:30]
+            
+            def export(context):
+                sheet_data = self.card_generator.generate_contact_sheet(employees, 'Список сотрудников')
+                context.check_cancelled()
                 with open(filename, 'wb') as f:
                     f.write(sheet_data)
-                QMessageBox.information(self, 'Успех', f'Лист контактов успешно сохранен!\nЭкспортировано: {min(len(self.current_employees), 30)} сотрудников')
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось создать лист контактов: {str(e)}')
+                return len(employees)
+            
+            self.job_runner.submit(
+                'Лист контактов', export,
+                on_finished=lambda count: QMessageBox.information(
+                    self, 'Успех', f'Лист контактов успешно сохранен!\nЭкспортировано: {count} сотрудников'
+                ),
+                on_failed=lambda message: QMessageBox.critical(
+                    self, 'Ошибка', f'Не удалось создать лист контактов: {message}'
+                )
+            )
     
     def make_call(self, phone_number):
         QMessageBox.information(
@@ -924,7 +1131,7 @@ class MainWindow(QMainWindow):
         menu.addSeparator()
         export_vcard_action = menu.addAction("Экспортировать в vCard")
         
-        action = menu.exec(self.employee_table.mapToGlobal(position))
+        action = menu.exec(self.employee_table.viewport().mapToGlobal(position))
         
         if action == edit_action:
             self.edit_employee()
@@ -934,13 +1141,10 @@ class MainWindow(QMainWindow):
             self.export_vcard()
     
     def export_vcard(self):
-        selected_rows = self.employee_table.selectedItems()
-        if not selected_rows:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             return
         
-        row = self.employee_table.currentRow()
-        employee_id = int(self.employee_table.item(row, 0).text())
-        
         employee = self.database.get_employee(employee_id)
         if employee:
             filename, _ = QFileDialog.getSaveFileName(
@@ -992,12 +1196,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'У вас нет прав для добавления сотрудников!')
             return
         
-        selected_row = self.employee_table.currentRow()
-        if selected_row < 0:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудника для дублирования!')
             return
         
-        employee_id = int(self.employee_table.item(selected_row, 0).text())
         original_employee = self.database.get_employee(employee_id)
         
         reply = QMessageBox.question(
@@ -1031,8 +1234,6 @@ class MainWindow(QMainWindow):
             )
             
             self.database.add_employee(new_employee)
-            self.cache.invalidate_employees()
-            self.load_data()
             QMessageBox.information(self, 'Успех', 'Сотрудник успешно дублирован!')
     
     def delete_multiple_employees(self):
@@ -1040,28 +1241,24 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'У вас нет прав для удаления сотрудников!')
             return
         
-        selected_items = self.employee_table.selectedItems()
-        if not selected_items:
+        employee_ids = self.selected_employee_ids()
+        if not employee_ids:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудников для удаления!')
             return
         
-        selected_rows = set(item.row() for item in selected_items)
-        
         reply = QMessageBox.question(
             self,
             'Подтверждение',
-            f'Удалить {len(selected_rows)} сотрудников?',
+            f'Удалить {len(employee_ids)} сотрудников?',
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            for row in sorted(selected_rows, reverse=True):
-                employee_id = int(self.employee_table.item(row, 0).text())
-                self.database.delete_employee(employee_id)
+            with self.database.transaction():
+                for employee_id in employee_ids:
+                    self.database.delete_employee(employee_id)
             
-            self.cache.invalidate_employees()
-            self.load_data()
-            QMessageBox.information(self, 'Успех', f'Удалено сотрудников: {len(selected_rows)}')
+            QMessageBox.information(self, 'Успех', f'Удалено сотрудников: {len(employee_ids)}')
     
     def show_context_menu(self, position):
         menu = QMenu()
@@ -1104,24 +1301,33 @@ class MainWindow(QMainWindow):
         dialog.exec()
     
     def show_backup_dialog(self):
-        dialog = BackupDialog(self.backup_manager, self)
+        dialog = BackupDialog(self.backup_manager, self, job_runner=self.job_runner)
+        dialog.database_restored.connect(self.database.reload_after_restore)
         dialog.exec()
+        dialog.deleteLater()
     
     def quick_backup(self):
-        try:
-            backup_path = self.backup_manager.create_backup(f'Ручное создание {datetime.now().strftime("%Y-%m-%d %H:%M")}')
+        comment = f'Ручное создание {datetime.now().strftime("%Y-%m-%d %H:%M")}'
+        
+        def finished(backup_path):
             self.statusBar().showMessage(f'Резервная копия создана: {backup_path}', 5000)
             QMessageBox.information(self, 'Успех', f'Резервная копия создана:\n{backup_path}')
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Не удалось создать резервную копию:\n{str(e)}')
+        
+        self.job_runner.submit(
+            'Резервная копия',
+            lambda context: self.backup_manager.create_backup(comment, progress_callback=context.progress),
+            on_finished=finished,
+            on_failed=lambda message: QMessageBox.critical(
+                self, 'Ошибка', f'Не удалось создать резервную копию:\n{message}'
+            )
+        )
     
     def export_selected_vcard(self):
-        selected_row = self.employee_table.currentRow()
-        if selected_row < 0:
+        employee_id = self.selected_employee_id()
+        if employee_id is None:
             QMessageBox.warning(self, 'Ошибка', 'Выберите сотрудника!')
             return
         
-        employee_id = int(self.employee_table.item(selected_row, 0).text())
         employee = self.database.get_employee(employee_id)
         
         if employee:
@@ -1159,6 +1365,9 @@ class MainWindow(QMainWindow):
         if not ok:
             return
         
+        # Снимок выборки: пока задача выполняется, таблица может измениться
+        employees = list(self.current_employees)
+        
         if format_choice == 'CSV':
             filename, _ = QFileDialog.getSaveFileName(
                 self,
@@ -1167,11 +1376,13 @@ class MainWindow(QMainWindow):
                 'CSV файлы (*.csv)'
             )
             if filename:
-                try:
-                    self.export_import.export_to_csv(filename, self.current_employees)
-                    QMessageBox.information(self, 'Успех', f'Экспортировано записей: {len(self.current_employees)}')
-                except Exception as e:
-                    QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать: {str(e)}')
+                self.run_export_job(
+                    'Экспорт выборки в CSV', filename,
+                    lambda context: self.export_import.export_to_csv(
+                        filename, employees,
+                        progress_callback=lambda done: context.progress(done, len(employees))
+                    )
+                )
         
         elif format_choice == 'Excel':
             filename, _ = QFileDialog.getSaveFileName(
@@ -1181,11 +1392,13 @@ class MainWindow(QMainWindow):
                 'Excel файлы (*.xlsx)'
             )
             if filename:
-                try:
-                    self.export_import.export_to_excel(filename, self.current_employees)
-                    QMessageBox.information(self, 'Успех', f'Экспортировано записей: {len(self.current_employees)}')
-                except Exception as e:
-                    QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать: {str(e)}')
+                self.run_export_job(
+                    'Экспорт выборки в Excel', filename,
+                    lambda context: self.export_import.export_to_excel(
+                        filename, employees,
+                        progress_callback=lambda done: context.progress(done, len(employees))
+                    )
+                )
         
         elif format_choice == 'JSON':
             filename, _ = QFileDialog.getSaveFileName(
@@ -1195,11 +1408,39 @@ class MainWindow(QMainWindow):
                 'JSON файлы (*.json)'
             )
             if filename:
-                try:
-                    self.json_exporter.export_employees(self.current_employees, filename)
-                    QMessageBox.information(self, 'Успех', f'Экспортировано записей: {len(self.current_employees)}')
-                except Exception as e:
-                    QMessageBox.critical(self, 'Ошибка', f'Не удалось экспортировать: {str(e)}')
+                def export(context):
+                    self.json_exporter.export_employees(employees, filename)
+                    return len(employees)
+                
+                self.run_export_job('Экспорт выборки в JSON', filename, export)
+    
+    def run_export_job(self, title, filename, export):
+        """Экспорт в фоне; при отмене недописанный файл удаляется"""
+        def job(context):
+            try:
+                return export(context)
+            except JobCancelled:
+                if os.path.exists(filename):
+                    os.remove(filename)
+                raise
+        
+        self.job_runner.submit(
+            title, job,
+            on_finished=lambda count: QMessageBox.information(
+                self, 'Успех', f'Экспортировано записей: {count}'
+            ),
+            on_failed=lambda message: QMessageBox.critical(
+                self, 'Ошибка', f'Не удалось экспортировать данные: {message}'
+            )
+        )
+    
+    def closeEvent(self, event):
+        # Импорт идет одной транзакцией и при отмене откатывается целиком;
+        # задачи дожидаются, чтобы откат завершился до закрытия базы
+        self.job_runner.cancel_all()
+        self.job_runner.wait_for_done()
+        self.settings_manager.flush()
+        super().closeEvent(event)
     
     def show_export_menu(self):
         """Показать меню экспорта"""
@@ -4,6 +4,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QUrl
 from PyQt6.QtGui import QPixmap, QFont, QPainter, QPainterPath, QDesktopServices
 from database.models import Employee
 from database.database import Database
+from utils.photo_cache import get_photo_cache, MODE_COVER
 import webbrowser
 
 class RoundedPhotoLabel(QLabel):
@@ -21,8 +22,10 @@ class RoundedPhotoLabel(QLabel):
         """)
     
     def set_photo(self, photo_data: bytes):
+        # Декодируется готовая миниатюра из кэша, а не исходное фото
+        thumbnail = get_photo_cache().get(photo_data, (self.photo_size, self.photo_size), MODE_COVER)
         pixmap = QPixmap()
-        pixmap.loadFromData(photo_data)
+        pixmap.loadFromData(thumbnail or photo_data)
         
         scaled = pixmap.scaled(
             self.photo_size, 
@@ -7,6 +7,7 @@ from PyQt6.QtGui import QPixmap, QDragEnterEvent, QDropEvent, QPainter, QPen, QC
 from database.models import Employee, Department
 from database.database import Database
 from utils.validators import Validators
+from utils.photo_cache import get_photo_cache, MODE_COVER
 from typing import Optional
 
 class DragDropPhotoLabel(QLabel):
@@ -75,8 +76,9 @@ class DragDropPhotoLabel(QLabel):
         self.apply_style()
     
     def load_photo(self, photo_data: bytes):
+        thumbnail = get_photo_cache().get(photo_data, (self.width() - 10, self.height() - 10), MODE_COVER)
         pixmap = QPixmap()
-        pixmap.loadFromData(photo_data)
+        pixmap.loadFromData(thumbnail or photo_data)
         
         scaled_pixmap = pixmap.scaled(
             self.width() - 10, 
@@ -416,7 +418,7 @@ class ModernEmployeeDialog(QDialog):
             }
         """)
         self.manager_combo.addItem('👤 Нет руководителя', None)
-        all_employees = self.database.get_all_employees()
+        all_employees = self.database.list_employee_summaries()
         for emp in all_employees:
             full_name = f"{emp.last_name} {emp.first_name}"
             if emp.middle_name:
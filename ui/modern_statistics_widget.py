@@ -1,24 +1,50 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QGroupBox, QFrame, QPushButton)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont, QPixmap
+from datetime import date
+from typing import Callable, Optional
 from database.database import Database
-import matplotlib
-matplotlib.use('Qt5Agg')
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from database.models import EmployeeStatistics
 
-class StatisticsChart(FigureCanvasQTAgg):
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='#f5f6fa')
-        super().__init__(self.fig)
-        self.setParent(parent)
+# Серия изменений (импорт, массовое удаление) перерисовывает графики один раз
+REFRESH_DELAY_MS = 300
+
+_chart_class = None
+
+def statistics_chart_class():
+    """Класс холста графика; matplotlib импортируется при первом вызове,
+    а не при запуске приложения"""
+    global _chart_class
+    if _chart_class is None:
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+        from matplotlib.figure import Figure
+        
+        class StatisticsChart(FigureCanvasQTAgg):
+            def __init__(self, parent=None, width=5, height=4, dpi=100):
+                self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='#f5f6fa')
+                super().__init__(self.fig)
+                self.setParent(parent)
+        
+        _chart_class = StatisticsChart
+    return _chart_class
 
 class ModernStatisticsWidget(QWidget):
-    def __init__(self, database: Database):
+    """Панель статистики. update_statistics() только помечает данные
+    устаревшими: пересчет и отрисовка графиков выполняются по таймеру
+    и лишь когда панель видна"""
+    
+    def __init__(self, database: Database,
+                 statistics_source: Optional[Callable[[], EmployeeStatistics]] = None):
         super().__init__()
         self.database = database
+        self.statistics_source = statistics_source or database.get_statistics
+        self.dept_chart_canvas = None
+        self.position_chart_canvas = None
+        self._dirty = False
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh_if_visible)
         self.init_ui()
     
     def init_ui(self):
@@ -102,14 +128,12 @@ class ModernStatisticsWidget(QWidget):
         summary_group.setLayout(summary_layout)
         layout.addWidget(summary_group)
         
-        self.dept_chart_canvas = StatisticsChart(self, width=5, height=3, dpi=80)
-        layout.addWidget(self.dept_chart_canvas)
-        
-        self.position_chart_canvas = StatisticsChart(self, width=5, height=3, dpi=80)
-        layout.addWidget(self.position_chart_canvas)
+        # Холсты графиков создаются при первой отрисовке
+        self.charts_layout = QVBoxLayout()
+        layout.addLayout(self.charts_layout)
         
         refresh_button = QPushButton('🔄 Обновить статистику')
-        refresh_button.clicked.connect(self.update_statistics)
+        refresh_button.clicked.connect(self.refresh_statistics)
         layout.addWidget(refresh_button)
         
         layout.addStretch()
@@ -118,27 +142,44 @@ class ModernStatisticsWidget(QWidget):
         self.update_statistics()
     
     def update_statistics(self):
-        employees = self.database.get_all_employees()
+        self._dirty = True
+        self._refresh_timer.start(REFRESH_DELAY_MS)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._dirty:
+            self._refresh_timer.start(0)
+    
+    def refresh_if_visible(self):
+        # Скрытая панель остается помеченной и обновится в showEvent
+        if self._dirty and self.isVisible():
+            self.refresh_statistics()
+    
+    def ensure_charts(self):
+        if self.dept_chart_canvas is None:
+            chart_class = statistics_chart_class()
+            self.dept_chart_canvas = chart_class(self, width=5, height=3, dpi=80)
+            self.charts_layout.addWidget(self.dept_chart_canvas)
+            self.position_chart_canvas = chart_class(self, width=5, height=3, dpi=80)
+            self.charts_layout.addWidget(self.position_chart_canvas)
+    
+    def refresh_statistics(self):
+        self._dirty = False
+        self._refresh_timer.stop()
+        
+        stats = self.statistics_source()
         departments = self.database.get_all_departments()
         
-        total_count = len(employees)
+        total_count = stats.total
         self.total_employees_label.setText(f'👥 Всего сотрудников: {total_count}')
         
         if total_count > 0:
-            with_photo = sum(1 for emp in employees if emp.photo)
-            photo_percent = (with_photo / total_count) * 100
-            self.with_photo_label.setText(f'📷 С фото: {with_photo} ({photo_percent:.1f}%)')
-            
-            ages = []
-            from datetime import datetime
-            for emp in employees:
-                if emp.birth_date:
-                    birth_date = datetime.strptime(str(emp.birth_date), '%Y-%m-%d')
-                    age = (datetime.now() - birth_date).days // 365
-                    ages.append(age)
+            self.with_photo_label.setText(
+                f'📷 С фото: {stats.with_photo} ({stats.photo_ratio * 100:.1f}%)'
+            )
             
-            if ages:
-                avg_age = sum(ages) / len(ages)
+            avg_age = stats.average_age(date.today().year)
+            if avg_age is not None:
                 self.avg_age_label.setText(f'🎂 Средний возраст: {avg_age:.1f} лет')
             else:
                 self.avg_age_label.setText('🎂 Средний возраст: -')
@@ -146,20 +187,21 @@ class ModernStatisticsWidget(QWidget):
             self.with_photo_label.setText('📷 С фото: 0 (0%)')
             self.avg_age_label.setText('🎂 Средний возраст: -')
         
-        self.draw_department_chart(employees, departments)
-        self.draw_position_chart(employees)
+        self.ensure_charts()
+        self.draw_department_chart(stats, departments)
+        self.draw_position_chart(stats)
     
-    def draw_department_chart(self, employees, departments):
+    def draw_department_chart(self, stats, departments):
         self.dept_chart_canvas.fig.clear()
         ax = self.dept_chart_canvas.fig.add_subplot(111)
         
         dept_counts = {}
         for dept in departments:
-            count = sum(1 for emp in employees if emp.department_id == dept.id)
+            count = stats.by_department.get(dept.id, 0)
             if count > 0:
                 dept_counts[dept.name] = count
         
-        no_dept = sum(1 for emp in employees if emp.department_id is None)
+        no_dept = stats.by_department.get(None, 0)
         if no_dept > 0:
             dept_counts['Без отдела'] = no_dept
         
@@ -187,16 +229,16 @@ class ModernStatisticsWidget(QWidget):
                    fontsize=14, color='#95a5a6')
         
         ax.axis('equal')
-        self.dept_chart_canvas.draw()
+        self.dept_chart_canvas.draw_idle()
     
-    def draw_position_chart(self, employees):
+    def draw_position_chart(self, stats):
         self.position_chart_canvas.fig.clear()
         ax = self.position_chart_canvas.fig.add_subplot(111)
         
         position_counts = {}
-        for emp in employees:
-            pos = emp.position if emp.position else 'Не указана'
-            position_counts[pos] = position_counts.get(pos, 0) + 1
+        for position, count in stats.by_position.items():
+            pos = position if position else 'Не указана'
+            position_counts[pos] = position_counts.get(pos, 0) + count
         
         if position_counts:
             sorted_positions = sorted(position_counts.items(), key=lambda x: x[1], reverse=True)
@@ -219,14 +261,13 @@ class ModernStatisticsWidget(QWidget):
             ax.set_title('Топ должностей', fontsize=12, fontweight='bold', pad=15)
             ax.grid(axis='x', alpha=0.3, linestyle='--')
             
-            plt.setp(ax.get_yticklabels(), fontsize=9)
-            plt.setp(ax.get_xticklabels(), fontsize=9)
+            ax.tick_params(axis='both', labelsize=9)
         else:
             ax.text(0.5, 0.5, 'Нет данных', ha='center', va='center',
                    transform=ax.transAxes, fontsize=14, color='#95a5a6')
         
         self.position_chart_canvas.fig.tight_layout()
-        self.position_chart_canvas.draw()
+        self.position_chart_canvas.draw_idle()
 
 
 
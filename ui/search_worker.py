@@ -0,0 +1,77 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from database.database import Database
+
+class SearchSignals(QObject):
+    finished = pyqtSignal(int, str, object)
+    failed = pyqtSignal(int, str)
+
+class SearchWorker(QRunnable):
+    def __init__(self, controller: 'SearchController', query: str, generation: int):
+        super().__init__()
+        self.controller = controller
+        self.query = query
+        self.generation = generation
+        self.signals = SearchSignals()
+
+    def run(self):
+        # Пока задача ждала в очереди, пользователь мог ввести новый запрос
+        if self.controller.is_stale(self.generation):
+            return
+
+        try:
+            results = self.controller.database.search_employee_summaries(self.query)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+
+        if not self.controller.is_stale(self.generation):
+            self.signals.finished.emit(self.generation, self.query, results)
+
+class SearchController(QObject):
+    """Поиск с задержкой ввода: запрос выполняется в пуле потоков,
+    устаревшие результаты (после ввода нового запроса) отбрасываются"""
+
+    results_ready = pyqtSignal(str, object)
+    search_failed = pyqtSignal(str)
+
+    def __init__(self, database: Database, parent=None, debounce_ms: int = 250):
+        super().__init__(parent)
+        self.database = database
+        self._generation = 0
+        self._pending_query = ''
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        # Потоки не завершаются по простою, чтобы не плодить соединения SQLite
+        self._pool.setExpiryTimeout(-1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._start_search)
+
+    def schedule(self, query: str):
+        self._pending_query = query.strip()
+        self._generation += 1
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        self._generation += 1
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _start_search(self):
+        worker = SearchWorker(self, self._pending_query, self._generation)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        self._pool.start(worker)
+
+    def _on_finished(self, generation: int, query: str, results):
+        if not self.is_stale(generation):
+            self.results_ready.emit(query, results)
+
+    def _on_failed(self, generation: int, message: str):
+        if not self.is_stale(generation):
+            self.search_failed.emit(message)
@@ -159,6 +159,7 @@ class SettingsDialog(QDialog):
         self.settings_manager.set('auto_backup', self.auto_backup_check.isChecked())
         self.settings_manager.set('backup_interval', self.backup_interval_spin.value())
         self.settings_manager.set('max_backups', self.max_backups_spin.value())
+        self.settings_manager.flush()
         
         QMessageBox.information(
             self,
@@ -177,9 +178,11 @@ class SettingsDialog(QDialog):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.settings_manager.reset_to_defaults()
+            self.settings_manager.flush()
             self.load_current_settings()
             QMessageBox.information(self, 'Готово', 'Настройки сброшены!')
-
-
-
-
+    
+    def done(self, result):
+        # Закрытие диалога любым способом сохраняет накопленные изменения
+        self.settings_manager.flush()
+        super().done(result)
@@ -71,6 +71,18 @@ class ModernSplashScreen(QSplashScreen):
             # Плавное закрытие
             QTimer.singleShot(300, self.close)
     
+    def set_stage(self, progress: int, message: str):
+        """Показывает реальный этап запуска вместо имитации прогресса.
+        Вызывается между синхронными шагами, поэтому перерисовка немедленная"""
+        self.progress_timer.stop()
+        # Пока идет инициализация, цикл событий не крутит анимацию появления
+        self.animation_timer.stop()
+        self.opacity = 1.0
+        self.logo_scale = 1.0
+        self.progress = progress
+        self.current_message = message
+        self.repaint()
+    
     def drawContents(self, painter: QPainter):
         """Отрисовка содержимого splash screen"""
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -2,12 +2,18 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QGroupBox, QFrame)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
+from datetime import date
+from typing import Callable, Optional
 from database.database import Database
+from database.models import EmployeeStatistics
 
 class StatisticsWidget(QWidget):
-    def __init__(self, database: Database):
+    def __init__(self, database: Database,
+                 statistics_source: Optional[Callable[[], EmployeeStatistics]] = None):
         super().__init__()
         self.database = database
+        # Источник сводки: главное окно передает кэшированную версию
+        self.statistics_source = statistics_source or database.get_statistics
         self.init_ui()
     
     def init_ui(self):
@@ -45,29 +51,29 @@ class StatisticsWidget(QWidget):
         self.with_photo_label = QLabel('С фото: 0 (0%)')
         layout.addWidget(self.with_photo_label)
         
+        birthdays_group = QGroupBox('Ближайшие дни рождения')
+        self.birthdays_layout = QVBoxLayout()
+        birthdays_group.setLayout(self.birthdays_layout)
+        layout.addWidget(birthdays_group)
+        
         layout.addStretch()
         self.setLayout(layout)
         
         self.update_statistics()
     
     def update_statistics(self):
-        employees = self.database.get_all_employees()
+        stats = self.statistics_source()
         departments = self.database.get_all_departments()
         
-        self.total_employees_label.setText(f'Всего сотрудников: {len(employees)}')
+        self.total_employees_label.setText(f'Всего сотрудников: {stats.total}')
         
         while self.departments_layout.count():
             item = self.departments_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
         
-        dept_counts = {}
-        for emp in employees:
-            if emp.department_id:
-                dept_counts[emp.department_id] = dept_counts.get(emp.department_id, 0) + 1
-        
         for dept in departments:
-            count = dept_counts.get(dept.id, 0)
+            count = stats.by_department.get(dept.id, 0)
             dept_label = QLabel(f'{dept.name}: {count}')
             self.departments_layout.addWidget(dept_label)
         
@@ -76,30 +82,37 @@ class StatisticsWidget(QWidget):
             no_dept_label.setStyleSheet('color: gray; font-style: italic;')
             self.departments_layout.addWidget(no_dept_label)
         
-        from datetime import datetime
-        ages = []
-        for emp in employees:
-            if emp.birth_date:
-                try:
-                    birth_year = int(str(emp.birth_date).split('-')[0])
-                    age = datetime.now().year - birth_year
-                    if 18 <= age <= 100:
-                        ages.append(age)
-                except:
-                    pass
-        
-        if ages:
-            avg_age = sum(ages) / len(ages)
+        avg_age = stats.average_age(date.today().year, min_age=18, max_age=100)
+        if avg_age is not None:
             self.avg_age_label.setText(f'Средний возраст: {avg_age:.1f} лет')
         else:
             self.avg_age_label.setText('Средний возраст: -')
         
-        with_photo = sum(1 for emp in employees if emp.photo)
-        if employees:
-            percent = (with_photo / len(employees)) * 100
-            self.with_photo_label.setText(f'С фото: {with_photo} ({percent:.1f}%)')
+        if stats.total:
+            self.with_photo_label.setText(f'С фото: {stats.with_photo} ({stats.photo_ratio * 100:.1f}%)')
         else:
             self.with_photo_label.setText('С фото: 0 (0%)')
+        
+        self.update_birthdays()
+    
+    def update_birthdays(self, days: int = 14, limit: int = 5):
+        while self.birthdays_layout.count():
+            item = self.birthdays_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        
+        upcoming = self.database.get_upcoming_birthdays(days)
+        for emp, birthday in upcoming[:limit]:
+            label = QLabel(f'{birthday.strftime("%d.%m")} - {emp.last_name} {emp.first_name}')
+            self.birthdays_layout.addWidget(label)
+        
+        if len(upcoming) > limit:
+            self.birthdays_layout.addWidget(QLabel(f'... и еще {len(upcoming) - limit}'))
+        
+        if not upcoming:
+            no_birthdays_label = QLabel(f'Нет в ближайшие {days} дней')
+            no_birthdays_label.setStyleSheet('color: gray; font-style: italic;')
+            self.birthdays_layout.addWidget(no_birthdays_label)
 
 
 
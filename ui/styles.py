@@ -248,7 +248,7 @@ def get_main_stylesheet():
         /* TABLES - С красивыми заголовками */
         /* ============================================ */
         
-                 QTableWidget {{
+                 QTableView {{
              background-color: white;
              border: 2px solid {ColorPalette.BORDER_LIGHT};
              border-radius: 12px;
@@ -259,12 +259,12 @@ def get_main_stylesheet():
              alternate-background-color: #F8F9FA;
          }}
          
-         QTableWidget::item {{
+         QTableView::item {{
              padding: 12px;
              border: none;
          }}
          
-         QTableWidget::item:selected {{
+         QTableView::item:selected {{
              background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
                  stop:0 {ColorPalette.PRIMARY_LIGHTEST}, 
                  stop:1 {ColorPalette.PRIMARY_LIGHT});
@@ -272,11 +272,11 @@ def get_main_stylesheet():
              font-weight: 600;
          }}
          
-         QTableWidget::item:hover {{
+         QTableView::item:hover {{
              background-color: #E3F2FD;
          }}
          
-         QTableWidget::item:selected:hover {{
+         QTableView::item:selected:hover {{
              background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
                  stop:0 #BBDEFB, 
                  stop:1 #90CAF9);
@@ -474,7 +474,7 @@ def get_main_stylesheet():
           }}
          
          /* Улучшенные тени и эффекты глубины */
-         QTableWidget {{
+         QTableView {{
              selection-background-color: {ColorPalette.PRIMARY_LIGHTEST};
          }}
          
@@ -683,7 +683,7 @@ def get_main_stylesheet():
            }}
           
                      /* Плавное изменение цвета таблицы */
-           QTableWidget::item {{
+           QTableView::item {{
            }}
           
           /* Улучшенный эффект hover для деревьев */
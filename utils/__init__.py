@@ -1,11 +1,32 @@
-from .export_import import ExportImport
-from .qr_generator import QRGenerator
-from .card_generator import CardGenerator
-from .validators import Validators
-from .export_json import JSONExporter
-from .backup_manager import BackupManager
-from .settings_manager import SettingsManager
+import importlib
 
-__all__ = ['ExportImport', 'QRGenerator', 'CardGenerator', 'Validators', 
-           'JSONExporter', 'BackupManager', 'SettingsManager']
+# Имя -> модуль пакета. Модули загружаются при первом обращении к имени,
+# поэтому импорт utils (например, utils.jobs) не тянет за собой reportlab,
+# openpyxl, PIL и qrcode
+_EXPORTS = {
+    'ExportImport': 'export_import',
+    'QRGenerator': 'qr_generator',
+    'CardGenerator': 'card_generator',
+    'Validators': 'validators',
+    'JSONExporter': 'export_json',
+    'BackupManager': 'backup_manager',
+    'SettingsManager': 'settings_manager',
+    'CancellationToken': 'jobs',
+    'JobCancelled': 'jobs',
+    'JobContext': 'jobs',
+    'PhotoCache': 'photo_cache',
+    'get_photo_cache': 'photo_cache',
+    'StartupProfiler': 'startup_profiler',
+    'setup_application_logging': 'logging_setup',
+    'stop_queue_logging': 'logging_setup',
+}
 
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
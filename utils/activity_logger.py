@@ -1,14 +1,109 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 import json
+from database.connection import ConnectionManager
+from utils.logging_setup import GzipRotatingFileHandler, start_queue_logging
+
+HISTORY_INSERT_SQL = '''
+    INSERT INTO ActivityLog (timestamp, action, entity_type, entity_id, user, details)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+class HistoryWriter:
+    """Поток записи истории: записи копятся в очереди и фиксируются одной
+    транзакцией раз в flush_interval секунд или по batch_size записей,
+    поэтому log_action не ждет диска"""
+    
+    _STOP = object()
+    
+    def __init__(self, connections: ConnectionManager, flush_interval: float = 1.0,
+                 batch_size: int = 500):
+        self.connections = connections
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='HistoryWriter', daemon=True)
+        self._thread.start()
+    
+    def put(self, entry: tuple):
+        self._queue.put(entry)
+    
+    def flush(self):
+        """Ждет, пока все поставленные записи будут зафиксированы"""
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+    
+    def close(self, timeout: float = 5.0):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch: List[tuple] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            
+            while True:
+                if item is self._STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                break
+        
+        self.connections.close_current()
+    
+    def _write(self, batch: List[tuple]):
+        try:
+            with self.connections.transaction() as conn:
+                conn.executemany(HISTORY_INSERT_SQL, batch)
+        except Exception:
+            logging.getLogger(__name__).exception('Не удалось записать %d записей истории', len(batch))
 
 class ActivityLogger:
-    def __init__(self, log_dir='logs', log_file='activity.log', history_file='history.json'):
+    """Журнал действий пользователей: текстовый лог и история в SQLite.
+    
+    История только дописывается (без перезаписи файла на каждое действие)
+    и не ограничена по размеру; выборки по времени, объекту и пользователю
+    идут по индексам. Текстовый лог и история пишутся фоновыми потоками;
+    close() (вызывается и при выходе) дописывает накопленное.
+    """
+    
+    def __init__(self, log_dir='logs', log_file='activity.log', history_file='history.json',
+                 history_db='activity.db'):
         self.log_dir = log_dir
         self.log_file = os.path.join(log_dir, log_file)
         self.history_file = os.path.join(log_dir, history_file)
+        self.history_db = os.path.join(log_dir, history_db)
         
         os.makedirs(log_dir, exist_ok=True)
         
@@ -16,7 +111,7 @@ class ActivityLogger:
         self.logger.setLevel(logging.INFO)
         
         if not self.logger.handlers:
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+            file_handler = GzipRotatingFileHandler(self.log_file)
             file_handler.setLevel(logging.INFO)
             
             formatter = logging.Formatter(
@@ -25,7 +120,67 @@ class ActivityLogger:
             )
             file_handler.setFormatter(formatter)
             
-            self.logger.addHandler(file_handler)
+            start_queue_logging(self.logger, file_handler)
+        
+        self.connections = ConnectionManager(self.history_db)
+        self._init_history()
+        self.writer = HistoryWriter(self.connections)
+        atexit.register(self.close)
+    
+    def _init_history(self):
+        with self.connections.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ActivityLog (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    entity_type TEXT NOT NULL,
+                    entity_id INTEGER,
+                    user TEXT NOT NULL,
+                    details TEXT
+                )
+            ''')
+            # Внутри каждого индекса записи упорядочены по id, поэтому
+            # ORDER BY id DESC отдает последние добавленные без сортировки
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_activity_timestamp ON ActivityLog(timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_activity_entity ON ActivityLog(entity_type, entity_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_activity_user ON ActivityLog(user)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_activity_action ON ActivityLog(action)')
+            
+            self._migrate_json_history(conn)
+    
+    def _migrate_json_history(self, conn):
+        """Переносит историю из history.json прежних версий; файл
+        переименовывается, чтобы перенос не повторялся"""
+        if not os.path.exists(self.history_file):
+            return
+        
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+        
+        if not isinstance(history, list):
+            history = []
+        
+        # В файле новые записи шли первыми. Прежний журнал допускал пустые
+        # поля, а в таблице они обязательны: вместо них подставляются
+        # значения по умолчанию, чтобы запись и порядок сохранились
+        conn.executemany(
+            HISTORY_INSERT_SQL,
+            [(h.get('timestamp') or '', h.get('action') or '', h.get('entity_type') or '',
+              h.get('entity_id'), h.get('user') or 'system', h.get('details'))
+             for h in reversed(history) if isinstance(h, dict)]
+        )
+        os.replace(self.history_file, self.history_file + '.migrated')
+    
+    def flush(self):
+        self.writer.flush()
+    
+    def close(self):
+        self.writer.close()
+        self.connections.close_all()
     
     def log_action(self, action: str, entity_type: str, entity_id: Optional[int], 
                    user: str, details: Optional[str] = None):
@@ -39,48 +194,110 @@ class ActivityLogger:
     
     def add_to_history(self, action: str, entity_type: str, entity_id: Optional[int],
                        user: str, details: Optional[str] = None):
-        history = self.load_history()
+        self.writer.put((datetime.now().isoformat(), action, entity_type, entity_id, user, details))
+    
+    def _select_history(self, where: str = '1=1', params: tuple = (),
+                        limit: Optional[int] = None, order_by: str = 'id DESC') -> list:
+        # Выборка видит и записи, еще ожидающие в очереди
+        self.flush()
+        sql = f'SELECT * FROM ActivityLog WHERE {where} ORDER BY {order_by}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params = params + (limit,)
+        rows = self.connections.get().execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _history_filter(action: Optional[str] = None, entity_type: Optional[str] = None,
+                        user: Optional[str] = None, user_contains: Optional[str] = None,
+                        since: Optional[str] = None, until: Optional[str] = None,
+                        before_id: Optional[int] = None,
+                        before: Optional[Tuple[str, int]] = None) -> Tuple[str, tuple]:
+        conditions = []
+        params = []
+        # При фильтре по времени выборку ведет индекс timestamp: унарный плюс
+        # не дает планировщику взять индекс по равенству и сортировать
+        # весь найденный интервал
+        column = '+{}' if since or until else '{}'
         
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'action': action,
-            'entity_type': entity_type,
-            'entity_id': entity_id,
-            'user': user,
-            'details': details
-        }
+        if action:
+            conditions.append(column.format('action') + ' = ?')
+            params.append(action)
+        if entity_type:
+            conditions.append(column.format('entity_type') + ' = ?')
+            params.append(entity_type)
+        if user:
+            conditions.append(column.format('user') + ' = ?')
+            params.append(user)
+        if user_contains:
+            conditions.append("user LIKE ? ESCAPE '\\'")
+            escaped = user_contains.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f'%{escaped}%')
+        if since:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if before is not None:
+            # Ключ страницы (время, id) последней записи; верхняя граница
+            # until для следующих страниц уже следует из него
+            conditions.append('timestamp <= ? AND (timestamp < ? OR id < ?)')
+            params.extend((before[0], before[0], before[1]))
+        elif until:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        if before_id is not None:
+            # Ключ страницы: следующая страница начинается после последнего id
+            conditions.append('id < ?')
+            params.append(before_id)
         
-        history.insert(0, entry)
+        return ' AND '.join(conditions) or '1=1', tuple(params)
+    
+    def query_history(self, limit: Optional[int] = 200, **filters) -> list:
+        """Записи истории по фильтрам, новые первыми.
         
-        if len(history) > 1000:
-            history = history[:1000]
+        Фильтры: action, entity_type, user (точное совпадение),
+        user_contains (подстрока), since/until (ISO-время, until
+        не включительно) и before_id для постраничного чтения: следующая
+        страница запрашивается с before_id = id последней полученной записи.
+        """
+        if not (filters.get('since') or filters.get('until')):
+            where, params = self._history_filter(**filters)
+            return self._select_history(where, params, limit)
         
-        self.save_history(history)
-    
-    def load_history(self) -> list:
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
+        # Время записи берется из часов системы и может идти назад (перевод
+        # часов), поэтому по id интервал не определить: выборка идет по
+        # индексу timestamp в его порядке, ключ страницы - пара (время, id)
+        before_id = filters.pop('before_id', None)
+        if before_id is not None:
+            self.flush()
+            row = self.connections.get().execute(
+                'SELECT timestamp, id FROM ActivityLog WHERE id = ?', (before_id,)
+            ).fetchone()
+            if row is None:
                 return []
-        return []
+            filters['before'] = tuple(row)
+        
+        where, params = self._history_filter(**filters)
+        return self._select_history(where, params, limit, order_by='timestamp DESC, id DESC')
     
-    def save_history(self, history: list):
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+    def iter_history(self, batch_size: int = 1000, **filters) -> Iterator[dict]:
+        """Все записи по фильтрам порциями по batch_size, без загрузки
+        всей выборки в память"""
+        before_id = filters.pop('before_id', None)
+        while True:
+            page = self.query_history(limit=batch_size, before_id=before_id, **filters)
+            yield from page
+            if len(page) < batch_size:
+                return
+            before_id = page[-1]['id']
     
     def get_recent_history(self, limit: int = 50) -> list:
-        history = self.load_history()
-        return history[:limit]
+        return self._select_history(limit=limit)
     
     def get_entity_history(self, entity_type: str, entity_id: int) -> list:
-        history = self.load_history()
-        return [h for h in history if h['entity_type'] == entity_type and h['entity_id'] == entity_id]
+        return self._select_history('entity_type = ? AND entity_id = ?', (entity_type, entity_id))
     
     def get_user_activity(self, user: str) -> list:
-        history = self.load_history()
-        return [h for h in history if h['user'] == user]
+        return self._select_history('user = ?', (user,))
     
     def log_employee_added(self, employee_id: int, user: str, employee_name: str):
         self.log_action('ДОБАВЛЕН', 'Сотрудник', employee_id, user, employee_name)
@@ -105,6 +322,3 @@ class ActivityLogger:
     
     def log_search(self, user: str, query: str, results_count: int):
         self.log_action('ПОИСК', 'Сотрудники', None, user, f'Запрос: {query}, Найдено: {results_count}')
-
-
-
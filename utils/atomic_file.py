@@ -0,0 +1,46 @@
+import os
+import stat
+import uuid
+
+# На Windows без O_BINARY запись шла бы в текстовом режиме
+_TEMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0)
+
+def write_atomic(path: str, data: bytes, fsync: bool = False, keep_mode: bool = False):
+    """Записывает файл через временный файл в том же каталоге и os.replace:
+    читатель видит либо прежнее содержимое, либо новое целиком.
+
+    Временный файл создается с правами 0666, урезанными umask процесса
+    (как у обычного open), а не 0600, как у mkstemp. keep_mode - перенести
+    права существующего файла; fsync - сбросить данные на диск до замены.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    base_name = os.path.basename(path)
+
+    for _ in range(100):
+        tmp_path = os.path.join(directory, f'.{base_name}.{uuid.uuid4().hex[:12]}.tmp')
+        try:
+            fd = os.open(tmp_path, _TEMP_FLAGS, 0o666)
+            break
+        except FileExistsError:
+            continue
+    else:
+        raise FileExistsError(f'Не удалось создать временный файл для {path}')
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if keep_mode:
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            except FileNotFoundError:
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,10 +1,21 @@
 import os
-import shutil
+import sqlite3
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 import json
+from utils.jobs import JobCancelled
+
+# Страниц за шаг копирования: между шагами база доступна другим соединениям
+BACKUP_STEP_PAGES = 256
 
 class BackupManager:
+    """Резервные копии через sqlite3 backup API: копия согласована
+    (даже в режиме WAL), строится порциями страниц и сообщает о прогрессе.
+    
+    progress_callback(done, total) получает число скопированных и всех
+    страниц; исключение из него (например, JobCancelled) прерывает операцию.
+    """
+    
     def __init__(self, db_path: str, backup_dir: str = 'backups'):
         self.db_path = db_path
         self.backup_dir = backup_dir
@@ -13,13 +24,52 @@ class BackupManager:
         if not os.path.exists(self.backup_dir):
             os.makedirs(self.backup_dir)
     
-    def create_backup(self, comment: Optional[str] = None) -> str:
+    @staticmethod
+    def _copy_database(source_path: str, target_path: str,
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       pages: int = BACKUP_STEP_PAGES):
+        def progress(status, remaining, total):
+            if progress_callback:
+                progress_callback(total - remaining, total)
+        
+        source = sqlite3.connect(source_path)
+        try:
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target, pages=pages, progress=progress)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    
+    @staticmethod
+    def check_integrity(path: str):
+        """PRAGMA integrity_check; исключение, если файл поврежден"""
+        connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            result = connection.execute('PRAGMA integrity_check').fetchall()
+        finally:
+            connection.close()
+        
+        if [row[0] for row in result] != ['ok']:
+            problems = '; '.join(row[0] for row in result[:5])
+            raise Exception(f'Файл копии поврежден: {problems}')
+    
+    def create_backup(self, comment: Optional[str] = None,
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> str:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_name = f'employees_backup_{timestamp}.db'
         backup_path = os.path.join(self.backup_dir, backup_name)
+        # Незавершенная копия не попадает в список: у нее другое расширение
+        tmp_path = backup_path + '.tmp'
         
         try:
-            shutil.copy2(self.db_path, backup_path)
+            try:
+                self._copy_database(self.db_path, tmp_path, progress_callback)
+                os.replace(tmp_path, backup_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
             
             if comment:
                 info_file = backup_path + '.info'
@@ -32,15 +82,24 @@ class BackupManager:
             
             self.cleanup_old_backups()
             return backup_path
+        except JobCancelled:
+            raise
         except Exception as e:
             raise Exception(f'Ошибка создания резервной копии: {str(e)}')
     
-    def restore_backup(self, backup_path: str) -> bool:
+    def restore_backup(self, backup_path: str,
+                       progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Проверяет копию и переносит ее в рабочую базу backup API.
+        Запись в рабочую базу идет одной транзакцией: другие соединения
+        видят либо прежние данные, либо восстановленные целиком"""
         try:
-            if os.path.exists(backup_path):
-                shutil.copy2(backup_path, self.db_path)
-                return True
-            return False
+            if not os.path.exists(backup_path):
+                return False
+            self.check_integrity(backup_path)
+            self._copy_database(backup_path, self.db_path, progress_callback)
+            return True
+        except JobCancelled:
+            raise
         except Exception as e:
             raise Exception(f'Ошибка восстановления: {str(e)}')
     
@@ -6,19 +6,44 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from PIL import Image
 from io import BytesIO
 from database.models import Employee
-from typing import List
+from utils.photo_cache import PhotoCache, get_photo_cache, make_thumbnail
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+# Строк сотрудников в одной таблице: примерно страница A4 с фото 15 мм.
+# Отдельные таблицы reportlab раскладывает по страницам без пересчета
+# всей огромной таблицы разом
+ROWS_PER_TABLE = 25
+
+# Фото обрабатываются блоками: пул получает работу порциями, а байты
+# исходных фото не держатся в памяти для всего списка сразу
+PHOTO_BLOCK_SIZE = 256
+
+# Для небольших списков запуск процессов дороже самой обработки
+MIN_PHOTOS_FOR_POOL = 32
+
+THUMBNAIL_SIZE = (50, 50)
+
+def _prepare_thumbnail(photo: Optional[bytes], size: Tuple[int, int] = THUMBNAIL_SIZE) -> Optional[bytes]:
+    """Миниатюра PNG для таблицы; функция верхнего уровня, чтобы ее можно
+    было передать в процесс пула"""
+    return make_thumbnail(photo, size)
+
 class EnhancedExporter:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, photo_cache: Optional[PhotoCache] = None):
         self.styles = getSampleStyleSheet()
-        
+        self.max_workers = max_workers
+        self.photo_cache = photo_cache or get_photo_cache()
+    
     def export_employees_to_pdf_with_template(self, employees: List[Employee], filename: str, 
                                                title: str = "Список сотрудников",
-                                               include_photos: bool = True):
+                                               include_photos: bool = True,
+                                               photo_loader: Optional[Callable[[int], Optional[bytes]]] = None):
+        """PDF-справочник; photo_loader(id) догружает фото для записей без
+        поля photo (например, EmployeeSummary)"""
         doc = SimpleDocTemplate(filename, pagesize=A4,
                                leftMargin=15*mm, rightMargin=15*mm,
                                topMargin=15*mm, bottomMargin=15*mm)
@@ -57,41 +82,99 @@ class EnhancedExporter:
             headers = ['№', 'ФИО', 'Должность', 'Отдел', 'Телефон', 'Email']
             col_widths = [10*mm, 50*mm, 40*mm, 35*mm, 35*mm, 45*mm]
         
-        data = [headers]
+        table_style = self._table_style()
         
-        for idx, emp in enumerate(employees, 1):
-            full_name = f"{emp.last_name} {emp.first_name}"
-            if emp.middle_name:
-                full_name += f" {emp.middle_name}"
-            
-            position = emp.position or '-'
-            department = '-'
-            phone = emp.work_phone or emp.mobile_phone or '-'
-            email = emp.email or '-'
-            
-            row = []
-            
-            if include_photos and emp.photo:
-                try:
-                    img = Image.open(BytesIO(emp.photo))
-                    img.thumbnail((50, 50))
-                    img_buffer = BytesIO()
-                    img.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-                    
-                    rl_img = RLImage(img_buffer, width=15*mm, height=15*mm)
-                    row.append(rl_img)
-                except:
-                    row.append('-')
-            elif include_photos:
-                row.append('-')
-            
-            row.extend([str(idx), full_name, position, department, phone, email])
-            data.append(row)
+        def add_tables(rows: list):
+            for start in range(0, len(rows), ROWS_PER_TABLE):
+                table = Table([headers] + rows[start:start + ROWS_PER_TABLE], colWidths=col_widths)
+                table.setStyle(table_style)
+                story.append(table)
+        
+        executor = None
+        if include_photos and len(employees) >= MIN_PHOTOS_FOR_POOL:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        
+        try:
+            for block_start in range(0, len(employees), PHOTO_BLOCK_SIZE):
+                block = employees[block_start:block_start + PHOTO_BLOCK_SIZE]
+                
+                thumbnails = [None] * len(block)
+                if include_photos:
+                    photos = [self._employee_photo(emp, photo_loader) for emp in block]
+                    thumbnails = self._thumbnails(photos, executor)
+                
+                rows = []
+                for idx, (emp, thumbnail) in enumerate(zip(block, thumbnails), block_start + 1):
+                    rows.append(self._employee_row(idx, emp, thumbnail, include_photos))
+                add_tables(rows)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        if not employees:
+            story.append(Table([headers], colWidths=col_widths, style=table_style))
         
-        table = Table(data, colWidths=col_widths, repeatRows=1)
+        doc.build(story)
+    
+    def _thumbnails(self, photos: List[Optional[bytes]],
+                    executor: Optional[ProcessPoolExecutor]) -> List[Optional[bytes]]:
+        """Миниатюры блока: сначала из общего кэша, промахи - в пул процессов"""
+        thumbnails: List[Optional[bytes]] = [None] * len(photos)
+        missing = []
+        for index, photo in enumerate(photos):
+            if not photo:
+                continue
+            key = self.photo_cache.key(photo, THUMBNAIL_SIZE)
+            thumbnails[index] = self.photo_cache.lookup(key)
+            if thumbnails[index] is None:
+                missing.append((index, key))
+        
+        if not missing:
+            return thumbnails
+        
+        pending = [photos[index] for index, _ in missing]
+        if executor is not None:
+            prepared = executor.map(_prepare_thumbnail, pending, chunksize=16)
+        else:
+            prepared = map(_prepare_thumbnail, pending)
+        
+        for (index, key), thumbnail in zip(missing, prepared):
+            thumbnails[index] = thumbnail
+            if thumbnail is not None:
+                self.photo_cache.store(key, thumbnail)
+        return thumbnails
+    
+    @staticmethod
+    def _employee_photo(emp, photo_loader: Optional[Callable[[int], Optional[bytes]]]) -> Optional[bytes]:
+        photo = getattr(emp, 'photo', None)
+        if photo is None and photo_loader is not None and getattr(emp, 'has_photo', True):
+            photo = photo_loader(emp.id)
+        return photo
+    
+    @staticmethod
+    def _employee_row(idx: int, emp, thumbnail: Optional[bytes], include_photos: bool) -> list:
+        full_name = f"{emp.last_name} {emp.first_name}"
+        if emp.middle_name:
+            full_name += f" {emp.middle_name}"
+        
+        position = emp.position or '-'
+        department = '-'
+        phone = emp.work_phone or emp.mobile_phone or '-'
+        email = emp.email or '-'
         
-        table_style = TableStyle([
+        row = []
+        if include_photos:
+            if thumbnail:
+                row.append(RLImage(BytesIO(thumbnail), width=15*mm, height=15*mm))
+            else:
+                row.append('-')
+        
+        row.extend([str(idx), full_name, position, department, phone, email])
+        return row
+    
+    @staticmethod
+    def _table_style() -> TableStyle:
+        return TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -108,11 +191,6 @@ class EnhancedExporter:
             ('LEFTPADDING', (0, 0), (-1, -1), 5),
             ('RIGHTPADDING', (0, 0), (-1, -1), 5),
         ])
-        
-        table.setStyle(table_style)
-        story.append(table)
-        
-        doc.build(story)
     
     def export_employee_report(self, employee: Employee, filename: str):
         doc = SimpleDocTemplate(filename, pagesize=A4,
@@ -133,19 +211,11 @@ class EnhancedExporter:
         
         story.append(Paragraph('ЛИЧНАЯ КАРТОЧКА СОТРУДНИКА', title_style))
         
-        if employee.photo:
-            try:
-                img = Image.open(BytesIO(employee.photo))
-                img.thumbnail((150, 150))
-                img_buffer = BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-                
-                rl_img = RLImage(img_buffer, width=40*mm, height=40*mm)
-                story.append(rl_img)
-                story.append(Spacer(1, 5*mm))
-            except:
-                pass
+        thumbnail = self.photo_cache.get(employee.photo, (150, 150))
+        if thumbnail:
+            rl_img = RLImage(BytesIO(thumbnail), width=40*mm, height=40*mm)
+            story.append(rl_img)
+            story.append(Spacer(1, 5*mm))
         
         full_name = f"{employee.last_name} {employee.first_name}"
         if employee.middle_name:
@@ -1,9 +1,10 @@
 import csv
-import pandas as pd
-from typing import List
-from datetime import datetime
-from database.models import Employee, Department
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from datetime import date, datetime
+from database.models import Employee, Department, RowError, BulkInsertResult
 from database.database import Database
+from openpyxl import Workbook, load_workbook
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -16,127 +17,229 @@ class ExportImport:
     def __init__(self, database: Database):
         self.database = database
     
-    def export_to_csv(self, filename: str, employees: List[Employee]):
+    CSV_FIELDNAMES = ['id', 'last_name', 'first_name', 'middle_name',
+                      'department_id', 'position', 'work_phone', 'mobile_phone',
+                      'email', 'birth_date', 'hire_date', 'room', 'skills']
+    
+    EXCEL_HEADERS = ['ID', 'Фамилия', 'Имя', 'Отчество', 'Отдел', 'Должность',
+                     'Рабочий телефон', 'Мобильный телефон', 'Email',
+                     'Дата рождения', 'Дата приема', 'Кабинет', 'Навыки']
+    
+    def _export_rows(self, employees: Optional[Iterable]) -> Iterable:
+        # Без явного списка сотрудники читаются курсором из базы порциями
+        if employees is None:
+            return self.database.iter_employee_summaries()
+        return employees
+    
+    @staticmethod
+    def _export_values(emp) -> list:
+        return [emp.id, emp.last_name, emp.first_name, emp.middle_name or '',
+                emp.department_id or '', emp.position or '', emp.work_phone or '',
+                emp.mobile_phone or '', emp.email or '', emp.birth_date or '',
+                emp.hire_date or '', emp.room or '', emp.skills or '']
+    
+    def export_to_csv(self, filename: str, employees: Optional[Iterable] = None,
+                      progress_callback: Optional[Callable[[int], None]] = None,
+                      progress_step: int = 1000) -> int:
+        """Потоковая запись CSV; возвращает число выгруженных строк"""
+        count = 0
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['id', 'last_name', 'first_name', 'middle_name',
-                         'department_id', 'position', 'work_phone', 'mobile_phone',
-                         'email', 'birth_date', 'hire_date', 'room', 'skills']
+            writer = csv.writer(csvfile)
+            writer.writerow(self.CSV_FIELDNAMES)
             
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for emp in employees:
-                writer.writerow({
-                    'id': emp.id,
-                    'last_name': emp.last_name,
-                    'first_name': emp.first_name,
-                    'middle_name': emp.middle_name or '',
-                    'department_id': emp.department_id or '',
-                    'position': emp.position or '',
-                    'work_phone': emp.work_phone or '',
-                    'mobile_phone': emp.mobile_phone or '',
-                    'email': emp.email or '',
-                    'birth_date': emp.birth_date or '',
-                    'hire_date': emp.hire_date or '',
-                    'room': emp.room or '',
-                    'skills': emp.skills or ''
-                })
+            for emp in self._export_rows(employees):
+                writer.writerow(self._export_values(emp))
+                count += 1
+                if progress_callback and count % progress_step == 0:
+                    progress_callback(count)
+        
+        if progress_callback and count % progress_step:
+            progress_callback(count)
+        return count
     
-    def import_from_csv(self, filename: str) -> int:
-        count = 0
+    def import_from_csv(self, filename: str, batch_size: int = 500,
+                        progress_callback: Optional[Callable[[int], None]] = None
+                        ) -> BulkInsertResult:
+        """Импорт одной транзакцией; ошибки возвращаются с номерами строк файла"""
+        parse_errors: List[RowError] = []
+        # Номер строки файла для каждой переданной в базу записи
+        line_numbers = array('L')
+        
         with open(filename, 'r', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
+            employees = self._csv_employees(reader, line_numbers, parse_errors)
+            result = self.database.bulk_insert_employees(
+                employees, batch_size=batch_size, progress_callback=progress_callback
+            )
+        
+        for error in result.errors:
+            error.row = line_numbers[error.row - 1]
+        result.errors = sorted(parse_errors + result.errors, key=lambda error: error.row)
+        return result
+    
+    @staticmethod
+    def _csv_employees(reader: csv.DictReader, line_numbers: array,
+                       errors: List[RowError]) -> Iterator[Employee]:
+        for row in reader:
+            try:
+                employee = Employee(
+                    id=None,
+                    last_name=row['last_name'],
+                    first_name=row['first_name'],
+                    middle_name=row.get('middle_name') or None,
+                    department_id=int(row['department_id']) if row.get('department_id') else None,
+                    position=row.get('position') or None,
+                    work_phone=row.get('work_phone') or None,
+                    mobile_phone=row.get('mobile_phone') or None,
+                    email=row.get('email') or None,
+                    birth_date=row.get('birth_date') or None,
+                    hire_date=row.get('hire_date') or None,
+                    photo=None,
+                    room=row.get('room') or None,
+                    skills=row.get('skills') or None,
+                    manager_id=None,
+                    work_schedule=None,
+                    telegram=None,
+                    whatsapp=None,
+                    skype=None
+                )
+            except KeyError as e:
+                errors.append(RowError(reader.line_num, f'Нет обязательного столбца {e}'))
+                continue
+            except ValueError as e:
+                errors.append(RowError(reader.line_num, f'Некорректное значение: {e}'))
+                continue
             
-            for row in reader:
-                try:
-                    employee = Employee(
-                        id=None,
-                        last_name=row['last_name'],
-                        first_name=row['first_name'],
-                        middle_name=row.get('middle_name') or None,
-                        department_id=int(row['department_id']) if row.get('department_id') else None,
-                        position=row.get('position') or None,
-                        work_phone=row.get('work_phone') or None,
-                        mobile_phone=row.get('mobile_phone') or None,
-                        email=row.get('email') or None,
-                        birth_date=row.get('birth_date') or None,
-                        hire_date=row.get('hire_date') or None,
-                        photo=None,
-                        room=row.get('room') or None,
-                        skills=row.get('skills') or None
-                    )
-                    self.database.add_employee(employee)
-                    count += 1
-                except Exception:
-                    continue
+            line_numbers.append(reader.line_num)
+            yield employee
+    
+    def export_to_excel(self, filename: str, employees: Optional[Iterable] = None,
+                        progress_callback: Optional[Callable[[int], None]] = None,
+                        progress_step: int = 1000) -> int:
+        """Запись книги в режиме write_only: строки сразу уходят в файл,
+        а не накапливаются в памяти; возвращает число выгруженных строк"""
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(self.EXCEL_HEADERS)
+        
+        count = 0
+        for emp in self._export_rows(employees):
+            sheet.append(self._export_values(emp))
+            count += 1
+            if progress_callback and count % progress_step == 0:
+                progress_callback(count)
         
+        workbook.save(filename)
+        if progress_callback and count % progress_step:
+            progress_callback(count)
         return count
     
-    def export_to_excel(self, filename: str, employees: List[Employee]):
-        data = []
-        for emp in employees:
-            data.append({
-                'ID': emp.id,
-                'Фамилия': emp.last_name,
-                'Имя': emp.first_name,
-                'Отчество': emp.middle_name or '',
-                'Отдел': emp.department_id or '',
-                'Должность': emp.position or '',
-                'Рабочий телефон': emp.work_phone or '',
-                'Мобильный телефон': emp.mobile_phone or '',
-                'Email': emp.email or '',
-                'Дата рождения': emp.birth_date or '',
-                'Дата приема': emp.hire_date or '',
-                'Кабинет': emp.room or '',
-                'Навыки': emp.skills or ''
-            })
-        
-        df = pd.DataFrame(data)
-        df.to_excel(filename, index=False, engine='openpyxl')
+    EXCEL_COLUMN_MAPPING = {
+        'Фамилия': 'last_name',
+        'Имя': 'first_name',
+        'Отчество': 'middle_name',
+        'Отдел': 'department_id',
+        'Должность': 'position',
+        'Рабочий телефон': 'work_phone',
+        'Мобильный телефон': 'mobile_phone',
+        'Email': 'email',
+        'Дата рождения': 'birth_date',
+        'Дата приема': 'hire_date',
+        'Кабинет': 'room',
+        'Навыки': 'skills'
+    }
     
-    def import_from_excel(self, filename: str) -> int:
-        df = pd.read_excel(filename, engine='openpyxl')
-        count = 0
+    def import_from_excel(self, filename: str, batch_size: int = 500,
+                          progress_callback: Optional[Callable[[int], None]] = None
+                          ) -> BulkInsertResult:
+        """Потоковый импорт листа: строки читаются по одной (read_only),
+        поэтому память не зависит от размера файла"""
+        workbook = load_workbook(filename, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return BulkInsertResult()
+            
+            # Индексы столбцов определяются один раз по заголовку
+            columns = {}
+            for index, title in enumerate(header):
+                field_name = self.EXCEL_COLUMN_MAPPING.get(str(title).strip()) if title is not None else None
+                if field_name and field_name not in columns:
+                    columns[field_name] = index
+            
+            parse_errors: List[RowError] = []
+            line_numbers = array('L')
+            employees = self._excel_employees(rows, columns, line_numbers, parse_errors)
+            result = self.database.bulk_insert_employees(
+                employees, batch_size=batch_size, progress_callback=progress_callback
+            )
+        finally:
+            workbook.close()
         
-        column_mapping = {
-            'Фамилия': 'last_name',
-            'Имя': 'first_name',
-            'Отчество': 'middle_name',
-            'Отдел': 'department_id',
-            'Должность': 'position',
-            'Рабочий телефон': 'work_phone',
-            'Мобильный телефон': 'mobile_phone',
-            'Email': 'email',
-            'Дата рождения': 'birth_date',
-            'Дата приема': 'hire_date',
-            'Кабинет': 'room',
-            'Навыки': 'skills'
-        }
-        
-        for _, row in df.iterrows():
+        for error in result.errors:
+            error.row = line_numbers[error.row - 1]
+        result.errors = sorted(parse_errors + result.errors, key=lambda error: error.row)
+        return result
+    
+    @classmethod
+    def _excel_employees(cls, rows, columns: Dict[str, int], line_numbers: array,
+                         errors: List[RowError]) -> Iterator[Employee]:
+        def cell(values, field_name):
+            index = columns.get(field_name)
+            if index is None or index >= len(values):
+                return None
+            return cls._excel_text(values[index])
+        
+        # Строка 1 - заголовок
+        for line, values in enumerate(rows, start=2):
+            if not any(value is not None for value in values):
+                continue
+            
             try:
+                department = cell(values, 'department_id')
                 employee = Employee(
                     id=None,
-                    last_name=str(row.get('Фамилия', '')),
-                    first_name=str(row.get('Имя', '')),
-                    middle_name=str(row.get('Отчество', '')) if pd.notna(row.get('Отчество')) else None,
-                    department_id=int(row['Отдел']) if pd.notna(row.get('Отдел')) else None,
-                    position=str(row.get('Должность', '')) if pd.notna(row.get('Должность')) else None,
-                    work_phone=str(row.get('Рабочий телефон', '')) if pd.notna(row.get('Рабочий телефон')) else None,
-                    mobile_phone=str(row.get('Мобильный телефон', '')) if pd.notna(row.get('Мобильный телефон')) else None,
-                    email=str(row.get('Email', '')) if pd.notna(row.get('Email')) else None,
-                    birth_date=str(row.get('Дата рождения', '')) if pd.notna(row.get('Дата рождения')) else None,
-                    hire_date=str(row.get('Дата приема', '')) if pd.notna(row.get('Дата приема')) else None,
+                    last_name=cell(values, 'last_name') or '',
+                    first_name=cell(values, 'first_name') or '',
+                    middle_name=cell(values, 'middle_name'),
+                    department_id=int(float(department)) if department else None,
+                    position=cell(values, 'position'),
+                    work_phone=cell(values, 'work_phone'),
+                    mobile_phone=cell(values, 'mobile_phone'),
+                    email=cell(values, 'email'),
+                    birth_date=cell(values, 'birth_date'),
+                    hire_date=cell(values, 'hire_date'),
                     photo=None,
-                    room=str(row.get('Кабинет', '')) if pd.notna(row.get('Кабинет')) else None,
-                    skills=str(row.get('Навыки', '')) if pd.notna(row.get('Навыки')) else None
+                    room=cell(values, 'room'),
+                    skills=cell(values, 'skills'),
+                    manager_id=None,
+                    work_schedule=None,
+                    telegram=None,
+                    whatsapp=None,
+                    skype=None
                 )
-                self.database.add_employee(employee)
-                count += 1
-            except Exception:
+            except ValueError as e:
+                errors.append(RowError(line, f'Некорректное значение: {e}'))
                 continue
-        
-        return count
+            
+            line_numbers.append(line)
+            yield employee
+    
+    @staticmethod
+    def _excel_text(value) -> Optional[str]:
+        """Значение ячейки в виде строки для базы: даты в ISO, целые числа
+        без дробной части (телефоны и номера кабинетов хранятся как числа)"""
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        text = str(value).strip()
+        return text or None
     
     def export_to_vcard(self, filename: str, employee: Employee):
         vcard = f"BEGIN:VCARD\n"
@@ -170,7 +273,9 @@ class ExportImport:
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(vcard)
     
-    def export_to_pdf(self, filename: str, employees: List[Employee]):
+    def export_to_pdf(self, filename: str, employees: List[Employee],
+                      progress_callback: Optional[Callable[[int], None]] = None,
+                      progress_step: int = 1000) -> int:
         doc = SimpleDocTemplate(filename, pagesize=A4)
         elements = []
         
@@ -199,6 +304,8 @@ class ExportImport:
             position = emp.position or '-'
             
             data.append([full_name, position, phone, email])
+            if progress_callback and len(data) % progress_step == 0:
+                progress_callback(len(data) - 1)
         
         table = Table(data, colWidths=[2.5*inch, 2*inch, 1.5*inch, 2*inch])
         
@@ -217,6 +324,7 @@ class ExportImport:
         
         elements.append(table)
         doc.build(elements)
+        return len(data) - 1
 
 
 
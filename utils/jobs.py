@@ -0,0 +1,42 @@
+import threading
+from typing import Callable, Optional
+
+class JobCancelled(Exception):
+    """Задача остановлена по запросу пользователя"""
+
+class CancellationToken:
+    """Флаг отмены, который фоновая задача проверяет между порциями работы"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+class JobContext:
+    """Передается в функцию задачи: отчет о прогрессе и проверка отмены.
+
+    progress() сам проверяет токен, поэтому его можно передавать как
+    progress_callback в экспорт/импорт - отмена прервет их на следующей порции.
+    """
+
+    def __init__(self, token: CancellationToken,
+                 report: Optional[Callable[[int, int, str], None]] = None):
+        self.token = token
+        self._report = report
+
+    def progress(self, done: int, total: int = 0, message: str = ''):
+        self.token.raise_if_cancelled()
+        if self._report:
+            self._report(done, total, message)
+
+    def check_cancelled(self):
+        self.token.raise_if_cancelled()
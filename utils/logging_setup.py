@@ -0,0 +1,72 @@
+"""
+Логирование через очередь: вызывающий поток (обычно поток интерфейса)
+только кладет запись в очередь, а запись в файл, ротацию и сжатие
+выполняет отдельный поток QueueListener
+"""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listeners: List[QueueListener] = []
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, сжимающий закрытые сегменты в .gz"""
+
+    def __init__(self, filename: str, max_bytes: int = 5 * 1024 * 1024,
+                 backup_count: int = 5, encoding: str = 'utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self._gzip_rotator
+
+    @staticmethod
+    def _gzip_rotator(source: str, dest: str):
+        with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+def start_queue_logging(logger: logging.Logger, *handlers: logging.Handler) -> QueueListener:
+    """Подключает к logger обработчик-очередь; handlers выполняются
+    в потоке слушателя. Слушатель останавливается при завершении
+    процесса или явно через stop_queue_logging"""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+def stop_queue_logging():
+    """Дописывает накопленные записи и останавливает потоки слушателей"""
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(stop_queue_logging)
+
+def setup_application_logging(log_file: str = 'error.log', level: int = logging.INFO,
+                              console_level: int = logging.WARNING) -> QueueListener:
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = GzipRotatingFileHandler(log_file)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    return start_queue_logging(root, file_handler, console_handler)
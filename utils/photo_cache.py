@@ -0,0 +1,190 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional, Tuple
+
+from utils.atomic_file import write_atomic
+
+MODE_FIT = 'fit'
+MODE_COVER = 'cover'
+
+def make_thumbnail(photo: Optional[bytes], size: Tuple[int, int],
+                   mode: str = MODE_FIT) -> Optional[bytes]:
+    """Миниатюра PNG: fit - вписать с сохранением пропорций, cover -
+    заполнить размер целиком с обрезкой по центру. Функция верхнего уровня,
+    чтобы ее можно было выполнять в пуле процессов"""
+    if not photo:
+        return None
+    # PIL загружается при первой миниатюре, а не при запуске
+    from PIL import Image, ImageOps
+    try:
+        img = Image.open(BytesIO(photo))
+        img.draft('RGB', size)
+        if mode == MODE_COVER:
+            img = ImageOps.fit(img, size, Image.LANCZOS)
+        else:
+            img.thumbnail(size, Image.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
+    except Exception:
+        return None
+
+class PhotoCache:
+    """Кэш миниатюр, адресуемый содержимым: ключ - хеш байтов фото и
+    размер миниатюры. Два уровня: LRU в памяти и файлы на диске, поэтому
+    повторный просмотр сотрудника не декодирует исходный JPEG заново.
+
+    Каталог на диске ограничен max_disk_bytes: при превышении удаляются
+    давно не читавшиеся файлы (время изменения обновляется при чтении),
+    пока объем не опустится до 90% предела"""
+
+    def __init__(self, cache_dir: str = 'data/thumbnails',
+                 max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        # Объем каталога; None - еще не подсчитан
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    @staticmethod
+    def key(photo: bytes, size: Tuple[int, int], mode: str = MODE_FIT) -> str:
+        digest = hashlib.blake2b(photo, digest_size=20).hexdigest()
+        return f'{digest}_{size[0]}x{size[1]}_{mode}'
+
+    def get(self, photo: Optional[bytes], size: Tuple[int, int],
+            mode: str = MODE_FIT) -> Optional[bytes]:
+        """Миниатюра из кэша или созданная и сохраненная в кэш;
+        None, если фото нет или его не удалось декодировать"""
+        if not photo:
+            return None
+
+        key = self.key(photo, size, mode)
+        thumbnail = self.lookup(key)
+        if thumbnail is None:
+            thumbnail = make_thumbnail(photo, size, mode)
+            if thumbnail is not None:
+                self.store(key, thumbnail)
+        return thumbnail
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            thumbnail = self._memory.get(key)
+            if thumbnail is not None:
+                self._memory.move_to_end(key)
+                return thumbnail
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                thumbnail = f.read()
+        except OSError:
+            return None
+
+        try:
+            # Отметка использования для вытеснения давно не читавшихся
+            os.utime(path)
+        except OSError:
+            pass
+        self._remember(key, thumbnail)
+        return thumbnail
+
+    def store(self, key: str, thumbnail: bytes):
+        self._remember(key, thumbnail)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Запись через временный файл: читатель не увидит недописанную миниатюру
+            write_atomic(self._path(key), thumbnail)
+        except OSError:
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(thumbnail)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._trim_disk()
+
+    def _cached_files(self) -> list:
+        """(время изменения, размер, путь) файлов миниатюр в каталоге"""
+        files = []
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return files
+        for entry in entries:
+            if not entry.name.endswith('.png'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._cached_files())
+
+    def _trim_disk(self):
+        # Подсчет заново: каталог мог меняться другими копиями приложения
+        files = sorted(self._cached_files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 9 // 10
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+        if disk and os.path.isdir(self.cache_dir):
+            with self._disk_lock:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.png'):
+                        try:
+                            os.remove(os.path.join(self.cache_dir, name))
+                        except OSError:
+                            pass
+                self._disk_bytes = None
+
+    def _remember(self, key: str, thumbnail: bytes):
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = thumbnail
+            self._memory_bytes += len(thumbnail)
+
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+_shared_cache: Optional[PhotoCache] = None
+_shared_lock = threading.Lock()
+
+def get_photo_cache() -> PhotoCache:
+    """Общий кэш для карточек, диалогов и экспорта"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = PhotoCache()
+        return _shared_cache
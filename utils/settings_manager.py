@@ -1,10 +1,24 @@
+import atexit
 import json
+import logging
 import os
+import threading
 from typing import Any, Optional
 
+from utils.atomic_file import write_atomic
+
 class SettingsManager:
-    def __init__(self, settings_file: str = 'settings.json'):
+    """Настройки хранятся в памяти; изменения помечают их измененными
+    и записываются в файл одним разом через flush_delay секунд, при
+    закрытии диалога настроек и окна, а также при выходе из процесса"""
+    
+    def __init__(self, settings_file: str = 'settings.json', flush_delay: float = 2.0):
         self.settings_file = settings_file
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
         self.default_settings = {
             'cache_ttl': 300,
             'auto_backup': True,
@@ -17,6 +31,7 @@ class SettingsManager:
             'recent_searches': []
         }
         self.settings = self.load_settings()
+        atexit.register(self.flush)
     
     def load_settings(self) -> dict:
         if os.path.exists(self.settings_file):
@@ -29,49 +44,84 @@ class SettingsManager:
         return self.default_settings.copy()
     
     def save_settings(self):
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f'Ошибка сохранения настроек: {str(e)}')
-            return False
+        """Немедленная запись (без ожидания таймера)"""
+        with self._lock:
+            self._dirty = True
+        return self.flush()
+    
+    def mark_dirty(self):
+        with self._lock:
+            self._dirty = True
+            # Таймер не перезапускается: при непрерывных изменениях
+            # запись все равно выполняется не реже раза в flush_delay
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self) -> bool:
+        """Записывает накопленные изменения, если они есть"""
+        # Запись на диск идет вне основной блокировки, чтобы set() в потоке
+        # интерфейса не ждал fsync. Снимок берется под блокировкой записи:
+        # иначе более старый снимок мог бы записаться поверх нового
+        with self._write_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return True
+                data = json.dumps(self.settings, ensure_ascii=False, indent=2)
+                self._dirty = False
+            
+            try:
+                self._write_atomic(data)
+                return True
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                logging.getLogger(__name__).exception('Ошибка сохранения настроек')
+                return False
+    
+    def _write_atomic(self, data: str):
+        # При сбое остается прежний settings.json, а не обрезанный;
+        # права файла, выставленные пользователем, сохраняются
+        write_atomic(self.settings_file, data.encode('utf-8'), fsync=True, keep_mode=True)
     
     def get(self, key: str, default: Any = None) -> Any:
         return self.settings.get(key, default)
     
     def set(self, key: str, value: Any):
-        self.settings[key] = value
-        self.save_settings()
+        with self._lock:
+            self.settings[key] = value
+            self.mark_dirty()
     
     def add_search_to_history(self, search_query: str):
         if not search_query or not search_query.strip():
             return
         
-        recent = self.settings.get('recent_searches', [])
-        
-        if search_query in recent:
-            recent.remove(search_query)
-        
-        recent.insert(0, search_query)
-        
-        max_size = self.settings.get('search_history_size', 10)
-        recent = recent[:max_size]
-        
-        self.settings['recent_searches'] = recent
-        self.save_settings()
+        with self._lock:
+            recent = self.settings.get('recent_searches', [])
+            if recent and recent[0] == search_query:
+                return
+            
+            recent = [query for query in recent if query != search_query]
+            recent.insert(0, search_query)
+            
+            max_size = self.settings.get('search_history_size', 10)
+            self.settings['recent_searches'] = recent[:max_size]
+            self.mark_dirty()
     
     def get_search_history(self) -> list:
         return self.settings.get('recent_searches', [])
     
     def clear_search_history(self):
-        self.settings['recent_searches'] = []
-        self.save_settings()
+        with self._lock:
+            self.settings['recent_searches'] = []
+            self.mark_dirty()
     
     def reset_to_defaults(self):
-        self.settings = self.default_settings.copy()
-        self.save_settings()
-
-
-
-
+        with self._lock:
+            self.settings = self.default_settings.copy()
+            self.settings['recent_searches'] = []
+            self.mark_dirty()
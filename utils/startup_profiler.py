@@ -0,0 +1,44 @@
+"""
+Замер времени запуска по фазам: python main.py --profile-startup
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StartupProfiler:
+    """Собирает длительность фаз запуска. Выключенный профилировщик
+    ничего не записывает, поэтому вызовы можно оставлять в коде"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        if self.enabled:
+            self._phases.append((name, seconds))
+
+    def report(self) -> str:
+        total = sum(seconds for _, seconds in self._phases)
+        rows = self._phases + [('Итого (без ожидания входа)', total)]
+        width = max(len(name) for name, _ in rows)
+        lines = ['Время запуска по фазам:']
+        for name, seconds in rows:
+            lines.append(f'  {name:<{width}}  {seconds * 1000:8.1f} мс')
+        return '\n'.join(lines)
+
+    def log_report(self):
+        if self.enabled:
+            report = self.report()
+            logger.info(report)
+            print(report)
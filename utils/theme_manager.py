@@ -90,7 +90,7 @@ class ThemeManager:
                 padding: 10px;
             }
             
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 alternate-background-color: #f8f9fa;
                 gridline-color: #e1e8ed;
@@ -102,11 +102,11 @@ class ThemeManager:
                 color: #2c3e50;
             }
             
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
             
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #e3f2fd;
             }
             
@@ -317,7 +317,7 @@ class ThemeManager:
                 padding: 10px;
             }
             
-            QTableWidget {
+            QTableView {
                 background-color: #252526;
                 alternate-background-color: #2d2d30;
                 gridline-color: #3e3e42;
@@ -329,11 +329,11 @@ class ThemeManager:
                 color: #cccccc;
             }
             
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
             
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #3e3e42;
             }
             